@@ -13,29 +13,44 @@ import json
 import os
 import re
 import subprocess
+import sys
+import threading
 import uuid
 from datetime import datetime
 from pathlib import Path
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, File, Form, HTTPException, Query, Request, UploadFile
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 
 try:
-    from dashboard import db
+    from dashboard import archive, db
+    from dashboard.search_index import VectorIndex
 except ImportError:
-    import db  # python dashboard/app.py 로 실행 시
+    import archive  # python dashboard/app.py 로 실행 시
+    import db
+    from search_index import VectorIndex
 
 # 프로젝트 루트 (dashboard의 상위)
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 COLLECTOR_SCRIPT = PROJECT_ROOT / "tools" / "high_quality_image_collector.py"
 STATIC_DIR = Path(__file__).resolve().parent / "static"
+SEARCH_INDEX_DIR = PROJECT_ROOT / "data" / "search_index"
 
 # 수집 작업: 메모리(dict) + SQLite 영속화 (process 등 런타임 필드는 메모리만)
 jobs: dict[str, dict] = {}
 executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
 
+# 유사 이미지 검색: 작업별 embeddings.npy 를 모은 memmap 인덱스 + (텍스트/업로드 검색 시에만) CLIP 모델
+search_index = VectorIndex(SEARCH_INDEX_DIR)
+_brain = None
+_brain_lock = threading.Lock()
+
+# 학습용 샤드: 요청 시 없거나 오래됐으면 생성 (같은 작업을 동시에 두 번 만들지 않도록 작업별 잠금)
+_shards_locks: dict[str, threading.Lock] = {}
+_shards_locks_guard = threading.Lock()
+
 
 def _load_jobs() -> None:
     """DB에서 수집 이력 불러오기 (앱 시작·재시작 시)."""
@@ -80,16 +95,60 @@ class RunRequest(BaseModel):
     query: str = Field(..., min_length=1, description="검색어")
     limit: int = Field(20, ge=1, le=500, description="수집할 이미지 개수")
     out_dir: str = Field("data/naver_collected", description="저장 폴더 (프로젝트 기준)")
+    profile: bool = Field(False, description="수집기 cProfile 프로파일 저장 (--profile)")
+    export_shards: bool = Field(False, description="저장 후 학습용 tar 샤드 생성 (--export_shards)")
 
 
-def run_collector(job_id: str, query: str, limit: int, out_dir: str) -> None:
+def _store_job_metrics(job_id: str, out_dir: str) -> None:
+    """수집기가 남긴 out_dir/metrics.json 을 job_metrics 테이블에 저장 (없으면 무시)."""
+    path = PROJECT_ROOT / out_dir / "metrics.json"
+    if not path.is_file():
+        return
+    try:
+        metrics = json.loads(path.read_text(encoding="utf-8"))
+        db.save_job_metrics(job_id, metrics, datetime.now().isoformat())
+    except Exception as e:
+        print(f"[DB] 측정값 저장 실패 ({job_id}): {e}")
+
+
+def _index_job_for_search(job_id: str, out_dir: str) -> None:
+    """완료된 작업의 embeddings.npy 를 바로 검색 인덱스에 추가 (첫 검색 때 몰아서 하지 않도록)."""
+    try:
+        search_index.add_job(job_id, PROJECT_ROOT / out_dir)
+    except Exception as e:
+        print(f"[검색] 인덱스 추가 실패 ({job_id}): {e}")
+
+
+def _shards_lock(job_id: str) -> threading.Lock:
+    """작업별 샤드 생성 잠금 (다른 작업의 내보내기는 기다리지 않음)."""
+    with _shards_locks_guard:
+        return _shards_locks.setdefault(job_id, threading.Lock())
+
+
+def _stop_collector(proc: subprocess.Popen) -> None:
+    """수집기 종료: SIGTERM 후 10초 안에 안 끝나면 kill."""
+    proc.terminate()
+    try:
+        proc.communicate(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.communicate()
+
+
+def run_collector(job_id: str, query: str, limit: int, out_dir: str, profile: bool = False,
+                  export_shards: bool = False) -> None:
     """백그라운드에서 수집 스크립트 실행 후 결과 반영. 중단 시 process.terminate()로 종료 가능."""
     proc = None
     try:
         env = os.environ.copy()
         env["PYTHONIOENCODING"] = "utf-8"
+        cmd = ["python", str(COLLECTOR_SCRIPT), query, "--limit", str(limit), "--out_dir", out_dir]
+        if profile:
+            cmd.append("--profile")
+        if export_shards:
+            cmd.append("--export_shards")
         proc = subprocess.Popen(
-            ["python", str(COLLECTOR_SCRIPT), query, "--limit", str(limit), "--out_dir", out_dir],
+            cmd,
             cwd=str(PROJECT_ROOT),
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
@@ -99,22 +158,23 @@ def run_collector(job_id: str, query: str, limit: int, out_dir: str) -> None:
         )
         jobs[job_id]["process"] = proc
         if jobs[job_id].get("cancel_requested"):
-            proc.terminate()
-            proc.wait(timeout=10)
+            _stop_collector(proc)
             jobs[job_id]["status"] = "cancelled"
             jobs[job_id]["error"] = "사용자에 의해 중단됨"
             jobs[job_id]["finished_at"] = datetime.now().isoformat()
             _save_jobs()
+            _store_job_metrics(job_id, out_dir)
             return
         try:
             stdout, stderr = proc.communicate(timeout=600)
         except subprocess.TimeoutExpired:
-            proc.kill()
-            proc.wait()
+            # SIGTERM 이면 수집기가 finally 에서 metrics.json 을 쓰고 끝남. 응답 없을 때만 kill
+            _stop_collector(proc)
             jobs[job_id]["status"] = "failed"
             jobs[job_id]["error"] = "수집 시간 초과 (10분)"
             jobs[job_id]["finished_at"] = datetime.now().isoformat()
             _save_jobs()
+            _store_job_metrics(job_id, out_dir)
             return
         returncode = proc.returncode
     except Exception as e:
@@ -141,6 +201,7 @@ def run_collector(job_id: str, query: str, limit: int, out_dir: str) -> None:
         _set_job_log(job_id, stdout, stderr)
         jobs[job_id]["finished_at"] = datetime.now().isoformat()
         _save_jobs()
+        _store_job_metrics(job_id, out_dir)
         return
 
     # 스크립트 stdout에서 "총 N장 저장됨" 파싱 (한글 경로 등으로 glob이 0일 수 있음)
@@ -158,6 +219,8 @@ def run_collector(job_id: str, query: str, limit: int, out_dir: str) -> None:
     jobs[job_id]["finished_at"] = datetime.now().isoformat()
     _set_job_log(job_id, stdout, stderr)
     _save_jobs()
+    _store_job_metrics(job_id, out_dir)
+    _index_job_for_search(job_id, out_dir)
 
 
 app = FastAPI(title="CV Dataset Builder", description="이미지 수집 대시보드")
@@ -190,7 +253,7 @@ def api_run(req: RunRequest):
         "finished_at": None,
         "cancel_requested": False,
     }
-    executor.submit(run_collector, job_id, req.query, req.limit, out_dir)
+    executor.submit(run_collector, job_id, req.query, req.limit, out_dir, req.profile, req.export_shards)
     _save_jobs()
     return {"job_id": job_id}
 
@@ -267,6 +330,53 @@ def _job_out_path(job_id: str) -> Path | None:
     return path
 
 
+@app.get("/api/jobs/{job_id}/metrics")
+def api_job_metrics(job_id: str):
+    """작업 한 건의 단계별 측정값 (DB, 없으면 작업 폴더의 metrics.json)."""
+    if job_id not in jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+    metrics = db.get_job_metrics(job_id)
+    if metrics is None:
+        out_path = _job_out_path(job_id)
+        if out_path and (out_path / "metrics.json").is_file():
+            metrics = json.loads((out_path / "metrics.json").read_text(encoding="utf-8"))
+    if metrics is None:
+        raise HTTPException(status_code=404, detail="측정값이 없습니다.")
+    return {"job_id": job_id, "metrics": metrics}
+
+
+@app.get("/api/jobs/{job_id}/profile")
+def api_job_profile(job_id: str):
+    """--profile 로 실행한 작업의 cProfile 요약 (profile.txt). 원본 profile.prof 는 작업 폴더에 있음."""
+    out_path = _job_out_path(job_id)
+    if not out_path or not (out_path / "profile.txt").is_file():
+        raise HTTPException(status_code=404, detail="프로파일이 없습니다.")
+    return FileResponse(str(out_path / "profile.txt"), media_type="text/plain; charset=utf-8")
+
+
+@app.get("/api/metrics/trends")
+def api_metrics_trends(limit: int = 50):
+    """최근 작업들의 단계별 시간·카운터 (오래된 순). 대시보드 추세 표시용."""
+    rows = db.get_metrics_trend(max(1, min(limit, 500)))
+    items = []
+    for r in rows:
+        m = r.get("metrics") or {}
+        download = (m.get("histograms") or {}).get("download") or {}
+        items.append({
+            "job_id": r["job_id"],
+            "query": r.get("query"),
+            "status": r.get("status"),
+            "count": r.get("count"),
+            "started_at": r.get("started_at"),
+            "total_s": r.get("total_s"),
+            "stages": m.get("stages") or {},
+            "counters": m.get("counters") or {},
+            "download_p50_ms": download.get("p50_ms"),
+            "download_p90_ms": download.get("p90_ms"),
+        })
+    return {"jobs": items}
+
+
 @app.get("/api/jobs/{job_id}/images")
 def api_job_images(job_id: str):
     """해당 작업으로 수집된 이미지 파일명 목록. 디스크 기준으로 반환해 서빙 시 경로 일치."""
@@ -303,6 +413,194 @@ def api_serve_job_image(job_id: str, filename: str):
     return FileResponse(str(file_path), media_type="image/jpeg")
 
 
+@app.get("/api/jobs/{job_id}/shards")
+def api_job_shards(job_id: str, rebuild: bool = False,
+                   shard_size_mb: float | None = Query(None, gt=0, le=4096, description="샤드 하나의 최대 크기 (MB)")):
+    """학습용 샤드 index.json (샤드 목록·샘플별 오프셋). 없거나 manifest 보다 오래됐거나
+    shard_size_mb 가 기존 샤드와 다르면 이때 생성 (생략 시 기존 샤드 크기 그대로, 없으면 기본 256MB)."""
+    out_path = _job_out_path(job_id)
+    if not out_path or not (out_path / "manifest.jsonl").is_file():
+        raise HTTPException(status_code=404, detail="manifest.jsonl not found")
+    if jobs[job_id].get("status") == "running":
+        raise HTTPException(status_code=409, detail="수집이 끝난 뒤에 내보낼 수 있습니다.")
+    _use_tools_path()
+    import export_shards
+
+    with _shards_lock(job_id):
+        if rebuild or not export_shards.is_current(out_path, shard_size_mb):
+            export_shards.export_shards(out_path, shard_size_mb or export_shards.DEFAULT_SHARD_SIZE_MB)
+        index = export_shards.load_index(out_path)
+    return {"job_id": job_id, **index}
+
+
+@app.get("/api/jobs/{job_id}/shards/{name}")
+def api_job_shard_file(job_id: str, name: str):
+    """샤드 tar 하나 다운로드 (디스크에서 청크 단위로 전송)."""
+    if not re.fullmatch(r"shard-\d{6}\.tar|index\.json", name):
+        raise HTTPException(status_code=400, detail="Invalid shard name")
+    out_path = _job_out_path(job_id)
+    path = out_path / "shards" / name if out_path else None
+    if path is None or not path.is_file():
+        raise HTTPException(status_code=404, detail="샤드가 없습니다. 먼저 /api/jobs/{id}/shards 로 생성하세요.")
+    media_type = "application/json" if name.endswith(".json") else "application/x-tar"
+    return FileResponse(str(path), media_type=media_type, filename=f"{job_id}-{name}")
+
+
+def _archive_response(request: Request, job_ids: list[str], fmt: str, filename: str):
+    """작업 폴더들 → zip/tar 스트리밍 응답. Range(단일 구간)·If-Range 지원, 메모리 사용량은 청크 크기로 고정."""
+    if fmt not in archive.FORMATS:
+        raise HTTPException(status_code=400, detail="format 은 zip 또는 tar 입니다.")
+    entries = []
+    for job_id in job_ids:
+        out_path = _job_out_path(job_id)
+        if not out_path:
+            raise HTTPException(status_code=404, detail=f"Job or folder not found: {job_id}")
+        if jobs[job_id].get("status") == "running":
+            raise HTTPException(status_code=409, detail=f"수집 중인 작업입니다: {job_id}")
+        entries.extend(archive.job_entries(job_id, out_path))
+    try:
+        arc = archive.StreamingArchive(entries, fmt)
+    except archive.ArchiveTooLarge as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": arc.etag,
+        "Content-Disposition": f'attachment; filename="{filename}.{fmt}"',
+    }
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if if_range is None or if_range == arc.etag:
+        try:
+            byte_range = archive.parse_range(request.headers.get("range"), arc.size)
+        except archive.RangeNotSatisfiable:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{arc.size}", **headers})
+    if byte_range is None:
+        headers["Content-Length"] = str(arc.size)
+        return StreamingResponse(arc.iter_range(), media_type=arc.media_type, headers=headers)
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end - 1}/{arc.size}"
+    headers["Content-Length"] = str(end - start)
+    return StreamingResponse(arc.iter_range(start, end), status_code=206, media_type=arc.media_type, headers=headers)
+
+
+@app.get("/api/jobs/{job_id}/archive")
+def api_job_archive(job_id: str, request: Request, format: str = "zip"):
+    """작업 폴더 전체(이미지·manifest·임베딩·측정값)를 zip/tar 로 내려받기 (압축 없이 그대로 담음)."""
+    return _archive_response(request, [job_id], format, f"job-{job_id}")
+
+
+@app.get("/api/archive")
+def api_jobs_archive(request: Request, jobs_param: str = Query(..., alias="jobs"), format: str = "zip"):
+    """여러 작업을 한 파일로: ?jobs=id1,id2&format=zip|tar (작업마다 <job_id>/ 폴더)."""
+    job_ids = list(dict.fromkeys(j.strip() for j in jobs_param.split(",") if j.strip()))
+    if not job_ids:
+        raise HTTPException(status_code=400, detail="jobs 에 작업 ID 를 하나 이상 지정하세요.")
+    name = "jobs-" + "-".join(job_ids) if len(job_ids) <= 3 else f"jobs-{len(job_ids)}"
+    return _archive_response(request, job_ids, format, name)
+
+
+def _use_tools_path() -> None:
+    """tools/ 의 단계 모듈(brain, export_shards 등)을 import 할 수 있게 sys.path 에 추가."""
+    tools_dir = str(PROJECT_ROOT / "tools")
+    if tools_dir not in sys.path:
+        sys.path.insert(0, tools_dir)
+
+
+def _get_brain():
+    """검색용 CLIP 모델 (첫 텍스트/업로드 검색 때 한 번만 로딩)."""
+    global _brain
+    with _brain_lock:
+        if _brain is None:
+            _use_tools_path()
+            from brain import Brain
+            _brain = Brain()
+        return _brain
+
+
+def _sync_search_index() -> None:
+    """완료된 작업 중 아직 인덱싱 안 된 것만 인덱스에 추가 (증분)."""
+    pending = {}
+    for job_id, job in list(jobs.items()):
+        if job.get("status") != "done" or search_index.has_job(job_id):
+            continue
+        out_path = _job_out_path(job_id)
+        # 임베딩이 없거나 실패한 작업은 embeddings.npy 가 바뀌기 전까지 다시 읽지 않음
+        if out_path is not None and search_index.needs_sync(job_id, out_path):
+            pending[job_id] = out_path
+    if pending:
+        search_index.sync(pending)
+
+
+# 이전 실행에서 완료됐지만 인덱싱 안 된 작업은 시작할 때 백그라운드로 (검색 요청에서는 남은 것만)
+executor.submit(_sync_search_index)
+
+
+def _job_image_vector(job_id: str, filename: str):
+    """작업 폴더의 embeddings.npy 에서 해당 파일 행 꺼내기 (manifest.jsonl 과 같은 순서)."""
+    import numpy as np
+
+    out_path = _job_out_path(job_id)
+    if not out_path:
+        raise HTTPException(status_code=404, detail="Job or folder not found")
+    emb_path = out_path / "embeddings.npy"
+    if not emb_path.exists():
+        raise HTTPException(status_code=404, detail="이 작업에는 저장된 임베딩이 없습니다.")
+    try:
+        files = [
+            json.loads(line).get("file", "")
+            for line in (out_path / "manifest.jsonl").read_text(encoding="utf-8").splitlines()
+            if line.strip()
+        ]
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="manifest.jsonl not found")
+    if filename not in files:
+        raise HTTPException(status_code=404, detail="File not found")
+    return np.load(emb_path, mmap_mode="r")[files.index(filename)]
+
+
+@app.post("/api/search")
+def api_search(
+    text: str | None = Form(None),
+    job_id: str | None = Form(None),
+    file: str | None = Form(None),
+    image: UploadFile | None = File(None),
+    k: int = Form(20),
+):
+    """전체 작업 대상 유사 이미지 검색. 질의는 업로드 이미지 / 작업 이미지(job_id+file) / 텍스트 중 하나."""
+    k = max(1, min(k, 200))
+    if image is not None and image.filename:
+        import cv2
+        import numpy as np
+
+        data = image.file.read()
+        img_cv2 = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        if img_cv2 is None:
+            raise HTTPException(status_code=400, detail="이미지를 읽을 수 없습니다.")
+        query_vec = _get_brain().get_embeddings_bgr([img_cv2])[0]
+        mode = "image"
+    elif job_id and file:
+        query_vec = _job_image_vector(job_id, file)
+        mode = "job_image"
+    elif text and text.strip():
+        query_vec = _get_brain().get_text_embedding(text.strip())
+        mode = "text"
+    else:
+        raise HTTPException(status_code=400, detail="image, job_id+file, text 중 하나를 지정하세요.")
+
+    _sync_search_index()
+    if mode == "job_image":
+        # 질의 이미지 자신(유사도 1.0)은 결과에서 제외
+        results = search_index.search(query_vec, k=k + 1, job_ids=set(jobs.keys()))
+        results = [r for r in results if (r["job_id"], r["file"]) != (job_id, file)][:k]
+    else:
+        results = search_index.search(query_vec, k=k, job_ids=set(jobs.keys()))
+    for r in results:
+        r["url"] = f"/api/jobs/{r['job_id']}/images/{r['file']}"
+        r["query"] = jobs.get(r["job_id"], {}).get("query")
+    return {"mode": mode, "indexed": len(search_index), "results": results}
+
+
 # 프론트: dashboard/static/ (index.html, css/style.css, js/app.js)
 @app.get("/")
 def dashboard():
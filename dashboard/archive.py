@@ -0,0 +1,224 @@
+"""
+CV Dataset Builder - 작업 폴더 스트리밍 압축 파일 (zip / tar)
+압축 없이(stored) 파일을 그대로 이어 붙이므로 전체 크기와 각 파일의 위치를 시작 전에 알 수 있음.
+→ 메모리에 아카이브를 만들지 않고 디스크에서 바로 읽어 보내고, HTTP Range(이어받기)도 지원.
+
+- tar : PAX 헤더 + 512 단위로 채운 본문 + 끝 표시(빈 블록 2개)
+- zip : 로컬 헤더(플래그 bit 3) + 본문 + 데이터 디스크립터(CRC), 끝에 중앙 디렉터리.
+        CRC 는 본문을 보낼 때 같이 계산해 캐시하고, 앞부분을 건너뛴 Range 요청이면 그때 파일을 읽어 계산.
+        zip64 는 쓰지 않으므로 4GB·65535개를 넘으면 ArchiveTooLarge (tar 사용).
+"""
+import hashlib
+import re
+import struct
+import tarfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+
+FORMATS = {"zip": "application/zip", "tar": "application/x-tar"}
+CHUNK_SIZE = 1024 * 1024
+
+_ZIP32_LIMIT = 0xFFFFFFFF
+_ZIP_MAX_ENTRIES = 0xFFFF
+_ZIP_FLAGS = 0x08 | 0x800  # 데이터 디스크립터 사용, 파일명 UTF-8
+_ZIP_VERSION = 20
+
+# (경로, 크기, mtime_ns) → CRC32. 같은 파일을 여러 번 받아도 한 번만 계산.
+# LRU 로 크기 제한 (zip 한 개의 최대 항목 수만큼이면 본문을 보낸 뒤 중앙 디렉터리까지 캐시에서 나옴)
+_CRC_CACHE_SIZE = _ZIP_MAX_ENTRIES + 1
+_crc_cache: OrderedDict[tuple, int] = OrderedDict()
+_crc_lock = threading.Lock()
+
+
+class ArchiveTooLarge(ValueError):
+    pass
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+class Entry:
+    """아카이브에 들어갈 파일 하나 (arcname = 아카이브 안 경로)."""
+
+    def __init__(self, arcname: str, path: Path):
+        st = path.stat()
+        self.arcname = arcname
+        self.path = path
+        self.size = st.st_size
+        self.mtime = st.st_mtime
+        self.key = (str(path), st.st_size, st.st_mtime_ns)
+
+
+def job_entries(job_id: str, job_dir: Path, skip_dirs=("shards",)) -> list[Entry]:
+    """작업 폴더 전체 → <job_id>/... 항목 (학습용 샤드는 같은 내용이라 제외)."""
+    entries = []
+    for path in sorted(job_dir.rglob("*")):
+        rel = path.relative_to(job_dir)
+        if not path.is_file() or rel.parts[0] in skip_dirs:
+            continue
+        entries.append(Entry(f"{job_id}/{rel.as_posix()}", path))
+    return entries
+
+
+def _remember_crc(key: tuple, crc: int) -> None:
+    with _crc_lock:
+        _crc_cache[key] = crc
+        _crc_cache.move_to_end(key)
+        while len(_crc_cache) > _CRC_CACHE_SIZE:
+            _crc_cache.popitem(last=False)
+
+
+def file_crc(entry: Entry) -> int:
+    with _crc_lock:
+        if entry.key in _crc_cache:
+            _crc_cache.move_to_end(entry.key)
+            return _crc_cache[entry.key]
+    crc = 0
+    with entry.path.open("rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            crc = zlib.crc32(chunk, crc)
+    _remember_crc(entry.key, crc)
+    return crc
+
+
+class _Segment:
+    """아카이브의 연속 구간. 길이는 미리 정해지고 내용은 요청받을 때 만듦."""
+
+    def __init__(self, length: int, render=None, entry: Entry | None = None):
+        self.length = length
+        self.render = render  # () -> bytes (헤더·디스크립터·중앙 디렉터리)
+        self.entry = entry  # 파일 본문
+
+    def chunks(self, start: int, end: int):
+        """[start, end) 구간 바이트를 CHUNK_SIZE 이하 조각으로."""
+        if self.entry is None:
+            yield self.render()[start:end]
+            return
+        with self.entry.path.open("rb") as f:
+            f.seek(start)
+            whole = start == 0 and end == self.length
+            crc = 0
+            pos = start
+            while pos < end:
+                chunk = f.read(min(CHUNK_SIZE, end - pos))
+                if not chunk:
+                    raise IOError(f"파일이 전송 중에 줄었습니다: {self.entry.path}")
+                if whole:
+                    crc = zlib.crc32(chunk, crc)
+                pos += len(chunk)
+                yield chunk
+        if whole:
+            _remember_crc(self.entry.key, crc)
+
+
+def _tar_segments(entries: list[Entry]) -> list[_Segment]:
+    segments = []
+    for entry in entries:
+        info = tarfile.TarInfo(entry.arcname)
+        info.size = entry.size
+        info.mtime = int(entry.mtime)
+        info.mode = 0o644
+        header = info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape")
+        segments.append(_Segment(len(header), lambda h=header: h))
+        segments.append(_Segment(entry.size, entry=entry))
+        pad = -entry.size % tarfile.BLOCKSIZE
+        if pad:
+            segments.append(_Segment(pad, lambda n=pad: b"\0" * n))
+    segments.append(_Segment(2 * tarfile.BLOCKSIZE, lambda: b"\0" * (2 * tarfile.BLOCKSIZE)))
+    return segments
+
+
+def _dos_datetime(mtime: float) -> tuple[int, int]:
+    t = time.localtime(max(mtime, 315532800))  # zip 날짜는 1980년부터
+    return (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2), ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+
+
+def _zip_segments(entries: list[Entry]) -> list[_Segment]:
+    if len(entries) > _ZIP_MAX_ENTRIES:
+        raise ArchiveTooLarge(f"zip 항목이 {_ZIP_MAX_ENTRIES}개를 넘습니다. format=tar 를 사용하세요.")
+    segments = []
+    central = []
+    offset = 0
+    for entry in entries:
+        if offset > _ZIP32_LIMIT or entry.size >= _ZIP32_LIMIT:
+            raise ArchiveTooLarge("zip 크기가 4GB 를 넘습니다. format=tar 를 사용하세요.")
+        name = entry.arcname.encode("utf-8")
+        dos_time, dos_date = _dos_datetime(entry.mtime)
+        # 로컬 헤더: bit 3 이므로 CRC·크기는 0, 본문 뒤 디스크립터에 기록
+        local = struct.pack("<4s5H3L2H", b"PK\x03\x04", _ZIP_VERSION, _ZIP_FLAGS, 0, dos_time, dos_date,
+                            0, 0, 0, len(name), 0) + name
+        segments.append(_Segment(len(local), lambda h=local: h))
+        segments.append(_Segment(entry.size, entry=entry))
+        segments.append(_Segment(16, lambda e=entry: struct.pack("<4s3L", b"PK\x07\x08", file_crc(e), e.size, e.size)))
+
+        def central_record(e=entry, name=name, dos_time=dos_time, dos_date=dos_date, local_offset=offset):
+            return struct.pack("<4s6H3L5H2L", b"PK\x01\x02", (3 << 8) | _ZIP_VERSION, _ZIP_VERSION, _ZIP_FLAGS, 0,
+                               dos_time, dos_date, file_crc(e), e.size, e.size, len(name), 0, 0, 0, 0,
+                               (0o100644 << 16), local_offset) + name
+
+        central.append(_Segment(46 + len(name), central_record))
+        offset += len(local) + entry.size + 16
+    central_size = sum(s.length for s in central)
+    if offset + central_size > _ZIP32_LIMIT:
+        raise ArchiveTooLarge("zip 크기가 4GB 를 넘습니다. format=tar 를 사용하세요.")
+    end = struct.pack("<4s4H2LH", b"PK\x05\x06", 0, 0, len(entries), len(entries), central_size, offset, 0)
+    return segments + central + [_Segment(len(end), lambda: end)]
+
+
+class StreamingArchive:
+    """항목 목록 → 크기가 정해진 zip/tar 바이트열. iter_range 로 원하는 구간만 생성."""
+
+    def __init__(self, entries: list[Entry], fmt: str = "zip"):
+        if fmt not in FORMATS:
+            raise ValueError(f"지원하지 않는 형식: {fmt}")
+        self.fmt = fmt
+        self.media_type = FORMATS[fmt]
+        self.entries = entries
+        self.segments = _zip_segments(entries) if fmt == "zip" else _tar_segments(entries)
+        self.size = sum(s.length for s in self.segments)
+        digest = hashlib.sha1(fmt.encode())
+        for e in entries:
+            digest.update(f"{e.arcname}\0{e.key[1]}\0{e.key[2]}\n".encode("utf-8"))
+        # 내용(이름·크기·수정 시각)이 같으면 같은 ETag → If-Range 로 이어받기 판단
+        self.etag = f'"{digest.hexdigest()}"'
+
+    def iter_range(self, start: int = 0, end: int | None = None):
+        """[start, end) 바이트 (end 생략 시 끝까지)."""
+        end = self.size if end is None else end
+        pos = 0
+        for seg in self.segments:
+            seg_start, seg_end = pos, pos + seg.length
+            pos = seg_end
+            if seg_end <= start:
+                continue
+            if seg_start >= end:
+                break
+            yield from seg.chunks(max(start, seg_start) - seg_start, min(end, seg_end) - seg_start)
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """Range 헤더 → (start, end) (end 는 포함 안 함).
+    헤더가 없거나, 여러 구간이거나, 형식이 잘못됐으면(bytes=5-3 등) None → 무시하고 전체 전송 (RFC 9110).
+    올바른 구간인데 시작이 size 이상이면 RangeNotSatisfiable (416)."""
+    if not header:
+        return None
+    m = re.fullmatch(r"\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*", header)
+    if not m or not (m.group(1) or m.group(2)):
+        return None
+    if m.group(1):
+        start = int(m.group(1))
+        if m.group(2) and int(m.group(2)) < start:
+            return None
+        if start >= size:
+            raise RangeNotSatisfiable(header)
+        end = min(int(m.group(2)) + 1, size) if m.group(2) else size
+    else:
+        suffix = int(m.group(2))  # bytes=-N: 마지막 N 바이트
+        if suffix == 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        start, end = max(size - suffix, 0), size
+    return start, end
@@ -11,7 +11,7 @@ from dotenv import load_dotenv
 load_dotenv(Path(__file__).resolve().parent.parent / ".env")
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import Json, RealDictCursor
 
 # 연결: .env 또는 환경 변수 (PGHOST, PGUSER, PGPASSWORD, PGDATABASE, PGPORT)
 # URL 말고 변수만 써도 됨.
@@ -61,6 +61,15 @@ def init_schema(conn) -> None:
                 finished_at TEXT
             )
         """)
+        # 수집기가 남긴 단계별 측정값 (metrics.json). jobs 는 save_all_jobs 에서 통째로 다시 쓰므로 FK 없이 별도 보관
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS job_metrics (
+                job_id VARCHAR(32) PRIMARY KEY,
+                total_s DOUBLE PRECISION,
+                metrics JSONB NOT NULL,
+                created_at TEXT
+            )
+        """)
     conn.commit()
 
 
@@ -204,6 +213,7 @@ def delete_job(job_id: str) -> bool:
         init_schema(conn)
         with conn.cursor() as cur:
             cur.execute("DELETE FROM jobs WHERE id = %s", (job_id,))
+            cur.execute("DELETE FROM job_metrics WHERE job_id = %s", (job_id,))
         conn.commit()
         return True
     finally:
@@ -216,6 +226,65 @@ def clear_all_jobs() -> None:
         init_schema(conn)
         with conn.cursor() as cur:
             cur.execute("DELETE FROM jobs")
+            cur.execute("DELETE FROM job_metrics")
         conn.commit()
     finally:
         conn.close()
+
+
+def save_job_metrics(job_id: str, metrics: dict, created_at: str | None = None) -> None:
+    """작업 한 건의 단계별 측정값 저장 (있으면 덮어씀)."""
+    conn = _connect()
+    try:
+        init_schema(conn)
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO job_metrics (job_id, total_s, metrics, created_at)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (job_id) DO UPDATE SET
+                    total_s = EXCLUDED.total_s,
+                    metrics = EXCLUDED.metrics,
+                    created_at = EXCLUDED.created_at
+                """,
+                (job_id, metrics.get("total_s"), Json(metrics), created_at),
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def get_job_metrics(job_id: str) -> dict | None:
+    conn = _connect()
+    try:
+        init_schema(conn)
+        with conn.cursor() as cur:
+            cur.execute("SELECT metrics FROM job_metrics WHERE job_id = %s", (job_id,))
+            row = cur.fetchone()
+        return row[0] if row else None
+    finally:
+        conn.close()
+
+
+def get_metrics_trend(limit: int = 50) -> list[dict]:
+    """최근 작업들의 측정값 (오래된 순). 대시보드 추세 표시용."""
+    conn = _connect()
+    try:
+        init_schema(conn)
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                """
+                SELECT * FROM (
+                    SELECT m.job_id, j.query, j.status, j.count, j.started_at, m.total_s, m.metrics
+                    FROM job_metrics m
+                    LEFT JOIN jobs j ON j.id = m.job_id
+                    ORDER BY m.created_at DESC NULLS LAST
+                    LIMIT %s
+                ) t ORDER BY t.started_at ASC NULLS FIRST
+                """,
+                (limit,),
+            )
+            rows = cur.fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()
@@ -0,0 +1,236 @@
+"""
+CV Dataset Builder - 유사 이미지 검색 인덱스
+작업 폴더의 embeddings.npy(수집기가 manifest.jsonl 순서로 저장)를 하나의 벡터 파일로 모아
+np.memmap 으로 열어 검색. 새 작업은 파일 끝에 이어 붙이기만 하면 되므로 증분 구축 가능.
+
+파일 구성 (data/search_index/):
+- vectors.f32  : float32 행렬 (N x dim), L2 정규화된 임베딩을 순서대로 이어 붙임
+- items.jsonl  : 행 번호 순서의 {"job_id", "file"}
+- state.json   : {"dim", "count", "jobs", "skipped"} — count 까지만 유효한 행. 추가 전·재시작 시 그 뒤는 잘라냄.
+                 skipped = 임베딩이 없거나 추가에 실패한 작업 → embeddings.npy 가 바뀌기 전까지 다시 시도하지 않음
+"""
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+
+# 한 번에 곱할 행 수. 수십만 장이어도 메모리 사용량이 이 크기로 제한됨
+_CHUNK_ROWS = 65536
+
+
+class VectorIndex:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.vectors_path = self.root / "vectors.f32"
+        self.items_path = self.root / "items.jsonl"
+        self.state_path = self.root / "state.json"
+        self._lock = threading.Lock()  # 메모리 상태 교체·스냅샷
+        self._write_lock = threading.Lock()  # 파일 추가는 한 번에 하나
+        self._dim = 0
+        self._items: list[dict] = []
+        self._items_bytes = 0  # items.jsonl 의 유효 길이 (그 뒤는 커밋 안 된 추가)
+        self._jobs: set[str] = set()
+        self._skipped: dict[str, list | None] = {}
+        self._row_job: np.ndarray = np.zeros(0, dtype=np.int32)
+        self._job_ids: list[str] = []
+        self._mmap = None
+        self._load()
+
+    # --- 상태 로드/저장 ---
+    def _load(self) -> None:
+        if not self.state_path.exists():
+            # state 를 처음 쓰기 전에 중단된 추가 → 남은 파일은 모두 무효
+            self._truncate_files(0, 0)
+            return
+        state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        self._dim = int(state.get("dim") or 0)
+        count = int(state.get("count") or 0)
+        self._jobs = set(state.get("jobs") or [])
+        self._skipped = dict(state.get("skipped") or {})
+        items = []
+        nbytes = 0
+        if self.items_path.exists():
+            with self.items_path.open("rb") as f:
+                for line in f:
+                    if len(items) >= count:
+                        break
+                    nbytes += len(line)
+                    if line.strip():
+                        items.append(json.loads(line))
+        self._items = items
+        self._items_bytes = nbytes
+        self._truncate_files(len(items) * self._dim * 4, nbytes)
+        self._rebuild_row_jobs()
+
+    def _truncate_files(self, vectors_bytes: int, items_bytes: int) -> None:
+        """유효한 길이보다 뒤에 남은 데이터(추가 도중 중단된 부분) 잘라내기."""
+        for path, size in ((self.vectors_path, vectors_bytes), (self.items_path, items_bytes)):
+            if path.exists() and path.stat().st_size > size:
+                with path.open("r+b") as f:
+                    f.truncate(size)
+
+    def _save_state(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"dim": self._dim, "count": len(self._items), "jobs": sorted(self._jobs),
+                        "skipped": self._skipped}),
+            encoding="utf-8",
+        )
+        tmp.replace(self.state_path)
+
+    def _rebuild_row_jobs(self) -> None:
+        self._job_ids = sorted({it["job_id"] for it in self._items})
+        pos = {j: i for i, j in enumerate(self._job_ids)}
+        self._row_job = np.fromiter((pos[it["job_id"]] for it in self._items), dtype=np.int32, count=len(self._items))
+        self._mmap = None
+
+    def _matrix(self):
+        if not self._items:
+            return None
+        if self._mmap is None or self._mmap.shape[0] != len(self._items):
+            self._mmap = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(len(self._items), self._dim))
+        return self._mmap
+
+    # --- 증분 추가 ---
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def has_job(self, job_id: str) -> bool:
+        return job_id in self._jobs
+
+    @staticmethod
+    def _emb_stamp(out_path: Path) -> list | None:
+        try:
+            st = (out_path / "embeddings.npy").stat()
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime_ns]
+
+    def needs_sync(self, job_id: str, out_path: Path) -> bool:
+        """인덱싱 안 됐고, 건너뛴 적이 없거나 그 뒤로 embeddings.npy 가 바뀐 작업인지 (stat 한 번)."""
+        if job_id in self._jobs:
+            return False
+        return job_id not in self._skipped or self._skipped[job_id] != self._emb_stamp(out_path)
+
+    @staticmethod
+    def _read_job(out_path: Path) -> tuple[list[str], np.ndarray] | None:
+        """작업 폴더의 manifest.jsonl 파일 이름 + embeddings.npy. 임베딩이 없는 작업이면 None."""
+        emb_path = out_path / "embeddings.npy"
+        manifest_path = out_path / "manifest.jsonl"
+        if not emb_path.exists() or not manifest_path.exists():
+            return None  # 임베딩 저장 이전 작업, 저장한 이미지가 없는 작업 등
+        files = []
+        for line in manifest_path.read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                files.append(json.loads(line).get("file", ""))
+        vecs = np.load(emb_path).astype(np.float32, copy=False)
+        if vecs.ndim != 2 or vecs.shape[0] != len(files):
+            raise ValueError(f"embeddings.npy 와 manifest.jsonl 행 수 불일치: {out_path}")
+        return files, vecs
+
+    def add_job(self, job_id: str, out_path: Path) -> int:
+        """작업 하나를 인덱스 끝에 추가. 추가한 행 수 반환."""
+        return self.sync({job_id: out_path})
+
+    def sync(self, job_out_paths: dict[str, Path]) -> int:
+        """아직 인덱싱 안 된 작업들을 추가. {job_id: 저장 폴더}. 추가한 총 행 수 반환.
+        벡터·항목은 작업마다 파일 끝에 붙이고, 행→작업 배열 재구성과 state 저장은 마지막에 한 번만."""
+        with self._write_lock:
+            # 커밋(state) 전에 중단된 추가가 남긴 바이트를 먼저 잘라야 새 행이 올바른 위치에 붙음
+            dim = self._dim
+            rows, nbytes = len(self._items), self._items_bytes
+            self._truncate_files(rows * dim * 4, nbytes)
+            new_items: list[dict] = []
+            added_jobs: list[str] = []
+            skipped: dict[str, list | None] = {}
+            for job_id, out_path in job_out_paths.items():
+                if out_path is None or not self.needs_sync(job_id, out_path):
+                    continue
+                try:
+                    job = self._read_job(out_path)
+                    if job is None:
+                        skipped[job_id] = self._emb_stamp(out_path)
+                        continue
+                    files, vecs = job
+                    if dim and vecs.shape[1] != dim:
+                        raise ValueError(f"임베딩 차원 불일치 ({vecs.shape[1]} != {dim}): {out_path}")
+                    norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+                    vecs = vecs / np.maximum(norms, 1e-12)
+                    items = [{"job_id": job_id, "file": fname} for fname in files]
+                    lines = "".join(json.dumps(it, ensure_ascii=False) + "\n" for it in items).encode("utf-8")
+                    self.root.mkdir(parents=True, exist_ok=True)
+                    with self.vectors_path.open("ab") as f:
+                        f.write(np.ascontiguousarray(vecs, dtype=np.float32).tobytes())
+                    with self.items_path.open("ab") as f:
+                        f.write(lines)
+                except Exception as e:
+                    print(f"[검색] 인덱스 추가 실패 ({job_id}): {e} — embeddings.npy 가 바뀌기 전까지 건너뜀")
+                    skipped[job_id] = self._emb_stamp(out_path)
+                    self._truncate_files(rows * dim * 4, nbytes)  # 이 작업에서 쓰다 만 부분 제거
+                    continue
+                dim = vecs.shape[1]
+                rows += len(items)
+                nbytes += len(lines)
+                new_items.extend(items)
+                added_jobs.append(job_id)
+            if not added_jobs and not skipped:
+                return 0
+            # 검색 중인 스냅샷은 이전 리스트·배열을 그대로 쓰도록 새 객체로 교체
+            with self._lock:
+                self._dim = dim
+                self._items = self._items + new_items
+                self._items_bytes = nbytes
+                self._jobs.update(added_jobs)
+                self._skipped.update(skipped)
+                for job_id in added_jobs:
+                    self._skipped.pop(job_id, None)
+                self._save_state()
+                self._rebuild_row_jobs()
+            return len(new_items)
+
+    # --- 검색 ---
+    def search(self, query: np.ndarray, k: int = 20, job_ids: set[str] | None = None) -> list[dict]:
+        """코사인 유사도 상위 k개. job_ids 가 주어지면 해당 작업들만 대상 (삭제된 이력 제외용)."""
+        # 잠금은 스냅샷을 잡을 때만. 추가는 파일 끝에 이어 붙이고 배열·memmap 은 새로 만들어 바꾸므로
+        # 스냅샷의 앞쪽 행은 그대로 유효 → 여러 질의가 동시에 스캔 가능
+        with self._lock:
+            X = self._matrix()
+            dim = self._dim
+            items = self._items
+            row_job = self._row_job
+            job_list = self._job_ids
+        if X is None or k <= 0:
+            return []
+        q = np.asarray(query, dtype=np.float32).reshape(-1)
+        if q.shape[0] != dim:
+            raise ValueError(f"질의 임베딩 차원 불일치 ({q.shape[0]} != {dim})")
+        q = q / max(float(np.linalg.norm(q)), 1e-12)
+        allowed = None
+        if job_ids is not None:
+            allowed_idx = [i for i, j in enumerate(job_list) if j in job_ids]
+            allowed = np.isin(row_job, allowed_idx)
+
+        best_scores = np.empty(0, dtype=np.float32)
+        best_rows = np.empty(0, dtype=np.int64)
+        for start in range(0, X.shape[0], _CHUNK_ROWS):
+            scores = np.asarray(X[start:start + _CHUNK_ROWS] @ q)
+            if allowed is not None:
+                scores = np.where(allowed[start:start + scores.shape[0]], scores, -np.inf)
+            rows = np.arange(start, start + scores.shape[0])
+            scores = np.concatenate([best_scores, scores])
+            rows = np.concatenate([best_rows, rows])
+            if scores.shape[0] > k:
+                top = np.argpartition(-scores, k - 1)[:k]
+                scores, rows = scores[top], rows[top]
+            best_scores, best_rows = scores, rows
+
+        order = np.argsort(-best_scores)
+        results = []
+        for i in order:
+            if not np.isfinite(best_scores[i]):
+                continue
+            item = items[int(best_rows[i])]
+            results.append({"job_id": item["job_id"], "file": item["file"], "score": float(best_scores[i])})
+        return results
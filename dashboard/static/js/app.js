@@ -30,6 +30,9 @@ function renderJob(job) {
     if (job.count > 0) detail += '<button type="button" class="btn-sm" data-job-id="' + job.id + '">이미지 보기</button>';
   }
   if (job.status !== 'running') detail += '<a href="/static/log.html?job_id=' + job.id + '" class="btn-sm" target="_blank">로그</a>';
+  if (job.status !== 'running') detail += '<button type="button" class="btn-sm btn-metrics" data-job-id="' + job.id + '">측정</button>';
+  if (job.status === 'done' && job.count) detail += '<button type="button" class="btn-sm btn-shards" data-job-id="' + job.id + '">샤드</button>';
+  if (job.status === 'done' && job.count) detail += '<a href="/api/jobs/' + job.id + '/archive?format=zip" class="btn-sm">zip</a><a href="/api/jobs/' + job.id + '/archive?format=tar" class="btn-sm">tar</a>';
   detail += '<button type="button" class="btn-delete btn-sm" data-job-id="' + job.id + '" title="이력에서만 삭제">삭제</button>';
   if ((job.status === 'failed' || job.status === 'cancelled') && job.error) {
     var errLine = (job.error || '').split('\n')[0].trim().slice(0, 120);
@@ -40,7 +43,8 @@ function renderJob(job) {
     detail += '<div class="error-full">' + esc(job.error) + '</div></div>';
   }
   detail += '</div>';
-  return '<tr><td>' + job.id + '</td><td class="query-cell">' + esc(job.query) + '</td><td>' + job.limit + '</td><td class="path-cell">' + esc(job.out_dir) + '</td><td class="status-cell">' + status + detail + '</td></tr>';
+  var select = job.status === 'done' && job.count ? '<input type="checkbox" class="job-select" value="' + job.id + '"> ' : '';
+  return '<tr><td>' + select + job.id + '</td><td class="query-cell">' + esc(job.query) + '</td><td>' + job.limit + '</td><td class="path-cell">' + esc(job.out_dir) + '</td><td class="status-cell">' + status + detail + '</td></tr>';
 }
 
 async function showJobImages(jobId) {
@@ -57,13 +61,166 @@ async function showJobImages(jobId) {
       grid.innerHTML = '<p class="empty">이미지 없음</p>';
       return;
     }
-    grid.innerHTML = data.files.map(f => '<img src="/api/jobs/' + jobId + '/images/' + encodeURIComponent(f) + '" alt="" loading="lazy">').join('');
+    grid.innerHTML = data.files.map(f => '<img src="/api/jobs/' + jobId + '/images/' + encodeURIComponent(f) + '" alt="" loading="lazy" title="클릭: 비슷한 이미지 검색" data-job-id="' + jobId + '" data-file="' + f + '">').join('');
   } catch (e) {
     grid.innerHTML = '<p class="error">불러오기 실패: ' + e.message + '</p>';
   }
 }
+const searchResult = document.getElementById('searchResult');
+
+function renderSearchResults(data) {
+  searchResult.style.display = 'block';
+  var results = data.results || [];
+  if (results.length === 0) {
+    searchResult.innerHTML = '<p class="empty">결과 없음 (인덱스 ' + (data.indexed || 0) + '장)</p>';
+    return;
+  }
+  var esc = function(s) { return (s || '').replace(/&/g,'&amp;').replace(/</g,'&lt;').replace(/>/g,'&gt;'); };
+  searchResult.innerHTML = '<div class="search-grid">' + results.map(function(r) {
+    return '<figure><img src="/api/jobs/' + r.job_id + '/images/' + encodeURIComponent(r.file) + '" alt="" loading="lazy" data-job-id="' + r.job_id + '" data-file="' + r.file + '">' +
+      '<figcaption>' + esc(r.query) + ' · ' + r.score.toFixed(3) + '</figcaption></figure>';
+  }).join('') + '</div>';
+}
+
+async function runSearch(form) {
+  searchResult.style.display = 'block';
+  searchResult.innerHTML = '검색 중...';
+  try {
+    const res = await fetch('/api/search', { method: 'POST', body: form });
+    var text = await res.text();
+    var data = text ? JSON.parse(text) : {};
+    if (!res.ok) throw new Error(data.error || data.detail || res.statusText);
+    renderSearchResults(data);
+  } catch (e) {
+    searchResult.innerHTML = '<span class="error">검색 실패: ' + e.message + '</span>';
+  }
+}
+
+document.getElementById('btnSearch').onclick = function() {
+  var form = new FormData();
+  var fileInput = document.getElementById('searchImage');
+  var text = document.getElementById('searchText').value.trim();
+  if (fileInput.files.length > 0) form.append('image', fileInput.files[0]);
+  else if (text) form.append('text', text);
+  else { searchResult.style.display = 'block'; searchResult.innerHTML = '<span class="error">텍스트나 이미지를 입력하세요.</span>'; return; }
+  runSearch(form);
+};
+
+document.addEventListener('click', function(e) {
+  var img = e.target;
+  if (img.tagName !== 'IMG' || !img.dataset.file || !img.closest('#modalGrid, #searchResult')) return;
+  var form = new FormData();
+  form.append('job_id', img.dataset.jobId);
+  form.append('file', img.dataset.file);
+  document.getElementById('imageModal').classList.remove('show');
+  runSearch(form);
+  searchResult.scrollIntoView({ behavior: 'smooth' });
+});
+
+var STAGE_LABELS = { crawl: '크롤', model_load: '모델 로딩', download: '다운로드', decode: '디코드', quality: '품질 필터', embed: '임베딩', cluster: '클러스터링', write: '저장' };
+var TREND_STAGES = ['crawl', 'model_load', 'download', 'embed', 'cluster', 'write'];
+
+function fmtSec(v) { return v == null ? '-' : Number(v).toFixed(2); }
+
+async function showJobMetrics(jobId) {
+  const modal = document.getElementById('metricsModal');
+  const title = document.getElementById('metricsTitle');
+  const body = document.getElementById('metricsBody');
+  title.textContent = '단계별 측정: ' + jobId;
+  body.innerHTML = '로딩 중...';
+  modal.classList.add('show');
+  try {
+    const data = await api('/api/jobs/' + jobId + '/metrics');
+    var m = data.metrics || {};
+    var stages = m.stages || {};
+    var total = m.total_s || 0;
+    var html = '<p>총 ' + fmtSec(total) + '초</p><h4>단계별 시간</h4><table><tbody>';
+    Object.keys(stages).forEach(function(k) {
+      var pct = total > 0 ? stages[k] / total * 100 : 0;
+      html += '<tr><td>' + (STAGE_LABELS[k] || k) + '</td><td class="metric-num">' + fmtSec(stages[k]) + 's</td><td class="metric-num">' + pct.toFixed(1) + '%</td>' +
+        '<td style="width:50%"><span class="metric-bar" style="width:' + pct.toFixed(1) + '%"></span></td></tr>';
+    });
+    html += '</tbody></table><h4>카운터</h4><table><tbody>';
+    var counters = m.counters || {};
+    Object.keys(counters).forEach(function(k) { html += '<tr><td>' + k + '</td><td class="metric-num">' + counters[k] + '</td></tr>'; });
+    html += '</tbody></table>';
+    var hists = m.histograms || {};
+    Object.keys(hists).forEach(function(name) {
+      var h = hists[name];
+      var maxCount = Math.max.apply(null, h.counts.concat([1]));
+      html += '<h4>' + name + ' 지연 (건수 ' + h.count + ', p50 ' + fmtSec(h.p50_ms) + 'ms, p90 ' + fmtSec(h.p90_ms) + 'ms, p99 ' + fmtSec(h.p99_ms) + 'ms)</h4><table><tbody>';
+      h.counts.forEach(function(c, i) {
+        var label = i < h.buckets_ms.length ? '≤ ' + h.buckets_ms[i] + 'ms' : '> ' + h.buckets_ms[h.buckets_ms.length - 1] + 'ms';
+        html += '<tr><td>' + label + '</td><td class="metric-num">' + c + '</td><td style="width:60%"><span class="metric-bar" style="width:' + (c / maxCount * 100).toFixed(1) + '%"></span></td></tr>';
+      });
+      html += '</tbody></table>';
+    });
+    if (m.profile) html += '<p><a href="/api/jobs/' + jobId + '/profile" class="btn-sm" target="_blank">프로파일 요약 (cProfile)</a></p>';
+    body.innerHTML = html;
+  } catch (e) {
+    body.innerHTML = '<p class="error">불러오기 실패: ' + e.message + '</p>';
+  }
+}
+async function showJobShards(jobId, shardSizeMb) {
+  const modal = document.getElementById('metricsModal');
+  const body = document.getElementById('metricsBody');
+  document.getElementById('metricsTitle').textContent = '학습용 샤드: ' + jobId;
+  body.innerHTML = '샤드 준비 중... (처음 요청이면 생성)';
+  modal.classList.add('show');
+  try {
+    const index = await api('/api/jobs/' + jobId + '/shards' + (shardSizeMb ? '?shard_size_mb=' + shardSizeMb : ''));
+    var base = '/api/jobs/' + jobId + '/shards/';
+    var html = '<p>샘플 ' + index.samples.length + '개, 임베딩 차원 ' + (index.embedding_dim || '-') + ', 생성 ' + index.created_at + '</p>' +
+      '<p>샤드 최대 크기 <input type="number" id="shardSizeMb" class="shard-size" min="1" max="4096" value="' + index.shard_size_mb + '"> MB ' +
+      '<button type="button" class="btn-sm" id="btnShardRebuild">이 크기로 다시 만들기</button></p>' +
+      '<p>각 샘플: <code>&lt;key&gt;.jpg</code>, <code>&lt;key&gt;.json</code>(URL·텍스트 점수·해상도·선명도), <code>&lt;key&gt;.npy</code>(임베딩)</p>' +
+      '<table><thead><tr><th>샤드</th><th>샘플</th><th>크기</th></tr></thead><tbody>';
+    index.shards.forEach(function(sh) {
+      html += '<tr><td><a href="' + base + sh.name + '">' + sh.name + '</a></td><td class="metric-num">' + sh.samples + '</td><td class="metric-num">' + (sh.size / 1024 / 1024).toFixed(1) + ' MB</td></tr>';
+    });
+    html += '</tbody></table><p><a href="' + base + 'index.json" class="btn-sm">index.json</a></p>';
+    body.innerHTML = html;
+    document.getElementById('btnShardRebuild').onclick = function() {
+      var size = parseFloat(document.getElementById('shardSizeMb').value);
+      if (size > 0) showJobShards(jobId, size);
+    };
+  } catch (e) {
+    body.innerHTML = '<p class="error">샤드 생성 실패: ' + e.message + '</p>';
+  }
+}
+
+document.getElementById('metricsClose').onclick = () => document.getElementById('metricsModal').classList.remove('show');
+
+function refreshTrends() {
+  var box = document.getElementById('metricsTrend');
+  api('/api/metrics/trends?limit=30').then(function(data) {
+    var list = data.jobs || [];
+    if (list.length === 0) { box.innerHTML = '<p class="empty">측정값이 있는 작업이 없습니다.</p>'; return; }
+    var esc = function(s) { return (s || '').replace(/&/g,'&amp;').replace(/</g,'&lt;').replace(/>/g,'&gt;'); };
+    var head = '<tr><th>ID</th><th>검색어</th><th>총(s)</th>' + TREND_STAGES.map(function(k) { return '<th>' + STAGE_LABELS[k] + '</th>'; }).join('') + '<th>다운로드 p50/p90 (ms)</th><th>저장</th></tr>';
+    var rows = list.map(function(j) {
+      return '<tr><td>' + j.job_id + '</td><td>' + esc(j.query) + '</td><td class="metric-num">' + fmtSec(j.total_s) + '</td>' +
+        TREND_STAGES.map(function(k) { return '<td class="metric-num">' + fmtSec(j.stages[k]) + '</td>'; }).join('') +
+        '<td class="metric-num">' + fmtSec(j.download_p50_ms) + ' / ' + fmtSec(j.download_p90_ms) + '</td><td class="metric-num">' + (j.counters.saved || 0) + '</td></tr>';
+    }).join('');
+    // 평균 행
+    var avg = function(f) { var v = list.map(f).filter(function(x) { return x != null; }); return v.length ? v.reduce(function(a, b) { return a + b; }, 0) / v.length : null; };
+    var avgRow = '<tr><td colspan="2"><strong>평균</strong></td><td class="metric-num">' + fmtSec(avg(function(j) { return j.total_s; })) + '</td>' +
+      TREND_STAGES.map(function(k) { return '<td class="metric-num">' + fmtSec(avg(function(j) { return j.stages[k]; })) + '</td>'; }).join('') +
+      '<td class="metric-num">' + fmtSec(avg(function(j) { return j.download_p50_ms; })) + ' / ' + fmtSec(avg(function(j) { return j.download_p90_ms; })) + '</td><td></td></tr>';
+    box.innerHTML = '<table><thead>' + head + '</thead><tbody>' + rows + avgRow + '</tbody></table>';
+  }).catch(function(e) { box.innerHTML = '<p class="empty">추세 불러오기 실패: ' + (e.message || '') + '</p>'; });
+}
+
 document.getElementById('modalClose').onclick = () => document.getElementById('imageModal').classList.remove('show');
 
+document.getElementById('btnArchiveSelected').onclick = function() {
+  var ids = Array.prototype.map.call(document.querySelectorAll('.job-select:checked'), function(el) { return el.value; });
+  if (ids.length === 0) { alert('내려받을 작업을 선택하세요.'); return; }
+  var format = document.getElementById('archiveFormat').value;
+  location.href = '/api/archive?jobs=' + encodeURIComponent(ids.join(',')) + '&format=' + format;
+};
+
 document.getElementById('btnClearHistory').onclick = async function() {
   if (!confirm('수집 이력을 모두 삭제할까요?')) return;
   try {
@@ -97,6 +254,8 @@ document.addEventListener('click', async (e) => {
       .catch(function(err) { alert('삭제 실패: ' + (err.message || err)); btn.disabled = false; });
     return;
   }
+  if (e.target.classList.contains('btn-metrics') && e.target.dataset.jobId) { showJobMetrics(e.target.dataset.jobId); return; }
+  if (e.target.classList.contains('btn-shards') && e.target.dataset.jobId) { showJobShards(e.target.dataset.jobId); return; }
   if (e.target.classList.contains('btn-sm') && e.target.dataset.jobId && !e.target.classList.contains('btn-copy') && !e.target.classList.contains('btn-delete') && !e.target.closest('a')) showJobImages(e.target.dataset.jobId);
   if (e.target.classList.contains('btn-error-toggle')) {
     var wrap = e.target.closest('.error-wrap');
@@ -150,7 +309,10 @@ function refreshJobs(page) {
       if (pageNum < totalPages) parts.push('<button type="button" class="btn-page" data-page="' + (pageNum + 1) + '">다음</button>');
       paginationHtml = '<div class="pagination">' + parts.join(' ') + '</div>';
     }
+    // 진행 중 작업 폴링으로 다시 그려도 내려받기 선택은 유지
+    var checked = Array.prototype.map.call(jobList.querySelectorAll('.job-select:checked'), function(el) { return el.value; });
     jobList.innerHTML = tableHtml + paginationHtml;
+    jobList.querySelectorAll('.job-select').forEach(function(el) { el.checked = checked.indexOf(el.value) >= 0; });
     if (hasRunning && !refreshInterval) startElapsedTicker();
     if (!hasRunning) stopElapsedTicker();
   }).catch(function(e) { jobList.innerHTML = '<p class="empty">이력 불러오기 실패: ' + (e.message || '') + '</p>'; stopElapsedTicker(); });
@@ -168,6 +330,8 @@ btnRun.addEventListener('click', async () => {
   const query = document.getElementById('query').value.trim();
   const limit = parseInt(document.getElementById('limit').value, 10) || 20;
   const out_dir = document.getElementById('out_dir').value.trim() || 'data/naver_collected';
+  const profile = document.getElementById('profile').checked;
+  const export_shards = document.getElementById('exportShards').checked;
   if (!query) { runResult.style.display = 'block'; runResult.innerHTML = '<span class="error">검색어를 입력하세요.</span>'; return; }
 
   btnRun.disabled = true;
@@ -178,7 +342,7 @@ btnRun.addEventListener('click', async () => {
     const res = await fetch('/api/run', {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ query, limit, out_dir })
+      body: JSON.stringify({ query, limit, out_dir, profile, export_shards })
     });
     const data = await res.json();
     if (!res.ok) throw new Error(data.detail || '실패');
@@ -197,6 +361,7 @@ btnRun.addEventListener('click', async () => {
         else if (job.status === 'cancelled') runResult.innerHTML = '중단됨.';
         else runResult.innerHTML = '실패: ' + (job.error || '').substring(0, 200);
         refreshJobs();
+        refreshTrends();
       }
     }, 1000);
   } catch (e) {
@@ -206,3 +371,4 @@ btnRun.addEventListener('click', async () => {
 });
 
 refreshJobs();
+refreshTrends();
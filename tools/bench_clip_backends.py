@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""CLIP 추론 백엔드 비교: float32 eager 대비 정확도(코사인 일치도, 클러스터 선택 변화)와 처리량(images/sec).
+
+예) python tools/bench_clip_backends.py data/naver_collected/<job_id> --threads 4 --out bench_clip.json
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from brain import Brain
+from clip_backends import BACKENDS, make_backend
+from clustering import pick_best_cluster
+
+
+def load_images(image_dir: Path, max_images: int) -> list:
+    images = []
+    for path in sorted(image_dir.iterdir()):
+        if path.suffix.lower() not in (".jpg", ".jpeg", ".png", ".webp"):
+            continue
+        img = cv2.imdecode(np.fromfile(str(path), np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            continue
+        images.append(Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB)))
+        if len(images) >= max_images:
+            break
+    return images
+
+
+def run_backend(backend, pixel_values: np.ndarray, batch: int, repeat: int) -> tuple[np.ndarray, float]:
+    """(임베딩, images/sec). 첫 배치는 워밍업으로 한 번 더 돌리고 시간에서 제외."""
+    backend.image_features(pixel_values[:batch])
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parts = [backend.image_features(pixel_values[i:i + batch]) for i in range(0, len(pixel_values), batch)]
+        best = min(best, time.perf_counter() - start)
+        out = np.concatenate(parts)
+    return out, len(pixel_values) / best
+
+
+def normalize(X: np.ndarray) -> np.ndarray:
+    return X / np.linalg.norm(X, axis=1, keepdims=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLIP 백엔드 정확도·처리량 비교")
+    parser.add_argument("image_dir", help="이미지 폴더 (예: 수집 작업 폴더)")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="비교할 백엔드 (쉼표 구분)")
+    parser.add_argument("--no_quantize", action="store_true", help="int8 양자화 구성은 생략")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max_images", type=int, default=256)
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    images = load_images(Path(args.image_dir), args.max_images)
+    if not images:
+        print(f"[오류] 이미지가 없습니다: {args.image_dir}")
+        return 1
+    print(f"[벤치] 이미지 {len(images)}장, batch={args.batch}, threads={args.threads or '기본'}")
+
+    brain = Brain(threads=args.threads)
+    pixel_values = brain.processor(images=images, return_tensors="np")["pixel_values"].astype(np.float32)
+
+    # 기준: float32 eager (Brain 기본 백엔드)
+    ref, ref_ips = run_backend(brain.backend, pixel_values, args.batch, args.repeat)
+    ref = normalize(ref)
+    ref_label, ref_sel = pick_best_cluster(ref)
+    ref_set = set() if ref_sel is None else set(ref_sel.tolist())
+
+    configs = [(name, False) for name in args.backends.split(",") if name]
+    if not args.no_quantize:
+        configs += [(name, True) for name in args.backends.split(",") if name]
+
+    results = []
+    for name, quantize in configs:
+        label = f"{name}{'+int8' if quantize else ''}"
+        try:
+            if name == "torch" and not quantize:
+                emb, ips = ref, ref_ips
+            else:
+                backend = make_backend(name, brain.model, brain.device, quantize=quantize,
+                                       threads=args.threads, model_name=brain.model_name)
+                emb, ips = run_backend(backend, pixel_values, args.batch, args.repeat)
+                emb = normalize(emb)
+        except Exception as e:
+            print(f"  {label:18s} 실패: {e}")
+            results.append({"backend": name, "quantize": quantize, "error": str(e)})
+            continue
+
+        cos = np.sum(emb * ref, axis=1)
+        _, sel = pick_best_cluster(emb)
+        sel_set = set() if sel is None else set(sel.tolist())
+        union = ref_set | sel_set
+        row = {
+            "backend": name,
+            "quantize": quantize,
+            "images_per_sec": round(ips, 2),
+            "speedup": round(ips / ref_ips, 3),
+            "cosine_mean": round(float(cos.mean()), 6),
+            "cosine_min": round(float(cos.min()), 6),
+            "cluster_size": len(sel_set),
+            "cluster_size_ref": len(ref_set),
+            "cluster_jaccard": round(len(ref_set & sel_set) / len(union), 4) if union else 1.0,
+        }
+        results.append(row)
+        print(
+            f"  {label:18s} {row['images_per_sec']:8.2f} img/s (x{row['speedup']:.2f})"
+            f"  cos mean={row['cosine_mean']:.5f} min={row['cosine_min']:.5f}"
+            f"  cluster {row['cluster_size']}/{row['cluster_size_ref']} jaccard={row['cluster_jaccard']:.3f}"
+        )
+
+    if args.out:
+        Path(args.out).write_text(
+            json.dumps({"images": len(images), "batch": args.batch, "threads": args.threads, "results": results},
+                       ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+        print(f"[벤치] 결과 저장: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+수집 파이프라인 오프라인 벤치마크 (실제 네이버 접속 없음)
+로컬 스탠드인 서버(naver_standin.py) + 작은 랜덤 초기화 CLIP(또는 캐시된 실제 모델)로
+crawl_naver_images → download_image → quality_check → Brain → 클러스터링 단계별 처리량·지연 백분위를 측정.
+결과는 JSON 으로 저장하고 --compare 로 이전 결과와 비교.
+
+예) python tools/bench_pipeline.py --out bench_pipeline.json
+    python tools/bench_pipeline.py --crawl http --clip pretrained --compare bench_pipeline.json
+"""
+import argparse
+import json
+import platform
+import re
+import subprocess
+import sys
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from naver_standin import NaverStandIn
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class StageRecorder:
+    """단계별 호출 지연(초)과 처리한 항목 수를 모아 요약."""
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = {}
+        self.items: dict[str, int] = {}
+        self.wall: dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float, items: int = 1) -> None:
+        self.samples.setdefault(stage, []).append(seconds)
+        self.items[stage] = self.items.get(stage, 0) + items
+
+    def time(self, stage: str, fn, *args, items: int = 1, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.add(stage, time.perf_counter() - start, items)
+        return result
+
+    def summary(self) -> dict:
+        out = {}
+        for stage, secs in self.samples.items():
+            ms = np.asarray(secs) * 1000.0
+            # 병렬로 돈 단계는 벽시계 시간 기준 처리량, 아니면 호출 시간 합 기준
+            total = self.wall.get(stage, float(np.sum(secs)))
+            out[stage] = {
+                "calls": len(secs),
+                "items": self.items[stage],
+                "total_s": round(total, 4),
+                "throughput_per_s": round(self.items[stage] / total, 2) if total > 0 else None,
+                "mean_ms": round(float(ms.mean()), 3),
+                "p50_ms": round(float(np.percentile(ms, 50)), 3),
+                "p90_ms": round(float(np.percentile(ms, 90)), 3),
+                "p99_ms": round(float(np.percentile(ms, 99)), 3),
+                "max_ms": round(float(ms.max()), 3),
+            }
+        return out
+
+
+def crawl_http(base_url: str, query: str, limit: int) -> list[dict]:
+    """Chrome 없이 결과 페이지 HTML 에서 data-lazy-src 만 뽑는 대체 크롤 (크롤 단계 비교용이 아님)."""
+    url = f"{base_url}/search.naver?where=image&query={urllib.parse.quote(query)}"
+    with urllib.request.urlopen(url, timeout=10) as resp:
+        page = resp.read().decode("utf-8", errors="replace")
+    urls = list(dict.fromkeys(re.findall(r'data-lazy-src="([^"]+)"', page)))
+    return [{"url": u.replace("&amp;", "&"), "title": query} for u in urls[: limit * 2]]
+
+
+def random_clip(image_size: int = 224, seed: int = 0):
+    """벤치마크용 작은 랜덤 초기화 CLIP (다운로드 없음). 처리 비용 비교용이라 결과 품질은 의미 없음.
+    seed 고정 → 실행마다 같은 가중치·임베딩이라 클러스터링 작업량도 같아 --compare 가 공정함."""
+    import torch
+    from transformers import CLIPConfig, CLIPModel
+
+    config = CLIPConfig(
+        text_config={"hidden_size": 64, "intermediate_size": 128, "num_hidden_layers": 2, "num_attention_heads": 2},
+        vision_config={
+            "hidden_size": 128, "intermediate_size": 256, "num_hidden_layers": 4, "num_attention_heads": 4,
+            "image_size": image_size, "patch_size": 32,
+        },
+        projection_dim=64,
+    )
+    torch.manual_seed(seed)
+    return CLIPModel(config)
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=str(PROJECT_ROOT), capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def compare(current: dict, baseline_path: Path, threshold: float) -> int:
+    """단계별 p50·처리량 변화 출력. threshold(비율) 이상 나빠진 단계 수 반환."""
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    regressions = 0
+    print(f"\n[비교] 기준: {baseline_path} ({baseline.get('meta', {}).get('git_revision')})")
+    if baseline.get("meta", {}).get("seed") != current["meta"].get("seed"):
+        print(f"  [주의] 시드가 다름 ({baseline.get('meta', {}).get('seed')} vs {current['meta'].get('seed')}) — 클러스터링 작업량이 달라짐")
+    base_args = baseline.get("meta", {}).get("args") or {}
+    cur_args = current["meta"].get("args") or {}
+    if base_args.get("crawl") != cur_args.get("crawl"):
+        print(f"  [주의] --crawl 이 다름 ({base_args.get('crawl')} vs {cur_args.get('crawl')}) — 수집 단계는 비교되지 않음")
+    for stage, cur in current["stages"].items():
+        base = baseline.get("stages", {}).get(stage)
+        if not base:
+            print(f"  {stage:20s} (기준 없음)")
+            continue
+        p50 = (cur["p50_ms"] - base["p50_ms"]) / base["p50_ms"] if base["p50_ms"] else 0.0
+        tput = ((cur["throughput_per_s"] or 0) - (base["throughput_per_s"] or 0)) / (base["throughput_per_s"] or 1)
+        bad = p50 > threshold or tput < -threshold
+        regressions += bad
+        print(f"  {stage:20s} p50 {base['p50_ms']:9.2f} → {cur['p50_ms']:9.2f} ms ({p50:+.1%})"
+              f" | 처리량 {tput:+.1%}{'  ← 느려짐' if bad else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="수집 파이프라인 오프라인 벤치마크")
+    parser.add_argument("--query", default="벤치마크")
+    parser.add_argument("--limit", type=int, default=100, help="crawl_naver_images 의 limit (후보는 최대 2배)")
+    parser.add_argument("--images", type=int, default=200, help="스탠드인 코퍼스 이미지 수")
+    parser.add_argument("--latency_ms", type=float, default=50.0, help="이미지 응답 평균 지연")
+    parser.add_argument("--jitter_ms", type=float, default=20.0)
+    parser.add_argument("--error_rate", type=float, default=0.03)
+    parser.add_argument("--crawl", choices=("selenium", "http"), default="selenium",
+                        help="selenium = 실제 crawl_naver_images (Chrome 필요), http = HTML 직접 파싱")
+    parser.add_argument("--download_workers", type=int, default=1, help="다운로드 동시성 (수집기는 1)")
+    parser.add_argument("--clip", choices=("random", "pretrained"), default="random")
+    parser.add_argument("--seed", type=int, default=0, help="--clip random 가중치 시드")
+    parser.add_argument("--backend", default="torch")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--cluster_repeat", type=int, default=5)
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", default=None, help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.10, help="느려짐 판정 비율 (기본 10%%)")
+    args = parser.parse_args()
+
+    from brain import Brain
+    from clustering import pick_best_cluster
+    from image_io import download_image, quality_check
+
+    rec = StageRecorder()
+    with NaverStandIn(images=args.images, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                      error_rate=args.error_rate) as standin:
+        print(f"[벤치] 스탠드인 {standin.base_url} (이미지 {len(standin.corpus)}장, 지연 {args.latency_ms}±{args.jitter_ms}ms)")
+
+        # 1. 크롤 (처리량 = 찾은 후보 URL 수 / 초)
+        start = time.perf_counter()
+        if args.crawl == "selenium":
+            from naver_crawl import crawl_naver_images
+            candidates = crawl_naver_images(args.query, args.limit, base_url=standin.base_url)
+        else:
+            candidates = crawl_http(standin.base_url, args.query, args.limit)
+        rec.add("crawl_naver_images" if args.crawl == "selenium" else "crawl_http",
+                time.perf_counter() - start, len(candidates))
+
+        # 2. 다운로드 (호출별 지연)
+        def timed_download(url):
+            start = time.perf_counter()
+            result = download_image(url)
+            return result, time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.download_workers) as pool:
+            downloads = list(pool.map(timed_download, [c["url"] for c in candidates]))
+        rec.wall["download_image"] = time.perf_counter() - start
+        decoded = []
+        for (img, data), secs in downloads:
+            rec.add("download_image", secs)
+            if img is not None:
+                decoded.append(img)
+
+    # 3. 품질 필터
+    passed = [img for img in decoded if rec.time("quality_check", quality_check, img)]
+
+    # 4. Brain (전처리 / 추론 / 합계)
+    if args.clip == "random":
+        brain = Brain(backend=args.backend, threads=args.threads, model=random_clip(seed=args.seed),
+                      model_name="bench-random-clip")
+    else:
+        brain = Brain(backend=args.backend, threads=args.threads)
+    if passed:
+        brain.get_embeddings_bgr(passed[:1])  # 워밍업
+    vecs = []
+    for i in range(0, len(passed), args.batch):
+        chunk = passed[i:i + args.batch]
+        t0 = time.perf_counter()
+        pixel_values = brain.preprocess(chunk)
+        t1 = time.perf_counter()
+        vecs.append(brain.backend.image_features(pixel_values))
+        t2 = time.perf_counter()
+        rec.add("brain.preprocess", t1 - t0, len(chunk))
+        rec.add("brain.forward", t2 - t1, len(chunk))
+        rec.add("brain", t2 - t0, len(chunk))
+
+    # 5. 클러스터링
+    cluster_size = 0
+    if vecs:
+        X = np.concatenate(vecs)
+        X = X / np.linalg.norm(X, axis=1, keepdims=True)
+        for _ in range(max(args.cluster_repeat, 1)):
+            _, selected = rec.time("clustering", pick_best_cluster, X, items=len(X))
+        cluster_size = 0 if selected is None else len(selected)
+
+    result = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+            "seed": args.seed if args.clip == "random" else None,
+        },
+        "counts": {
+            "candidates": len(candidates),
+            "decoded": len(decoded),
+            "quality_passed": len(passed),
+            "cluster_size": cluster_size,
+        },
+        "stages": rec.summary(),
+    }
+
+    print(f"\n[벤치] 후보 {len(candidates)} → 디코드 {len(decoded)} → 품질 통과 {len(passed)} → 클러스터 {cluster_size}")
+    print(f"  {'단계':20s} {'처리량/s':>10s} {'p50 ms':>10s} {'p90 ms':>10s} {'p99 ms':>10s}")
+    for stage, s in result["stages"].items():
+        print(f"  {stage:20s} {s['throughput_per_s'] or 0:10.2f} {s['p50_ms']:10.2f} {s['p90_ms']:10.2f} {s['p99_ms']:10.2f}")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"[벤치] 결과 저장: {args.out}")
+    if args.compare:
+        return 1 if compare(result, Path(args.compare), args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""진입점별 기동 시간 측정 (python -X importtime). 무거운 import 가 다시 최상단으로 올라오지 않았는지 확인용.
+
+예) python tools/bench_startup.py --runs 5 --out bench_startup.json
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+TOOLS_DIR = PROJECT_ROOT / "tools"
+
+# 이름 → python 뒤에 붙일 인자 (cwd = 프로젝트 루트)
+ENTRY_POINTS = {
+    "collector --help": [str(TOOLS_DIR / "high_quality_image_collector.py"), "--help"],
+    "check_naver_crawl --help": [str(TOOLS_DIR / "check_naver_crawl.py"), "--help"],
+    "dashboard.app import": ["-c", "import dashboard.app"],
+    # 참고용: 단계 모듈을 모두 불러올 때 (실제 수집 시작 비용, 모델 로딩 제외)
+    "collector stages import": [
+        "-c",
+        f"import sys; sys.path.insert(0, {str(TOOLS_DIR)!r}); import naver_crawl, image_io, brain, clustering",
+    ],
+}
+
+
+def parse_importtime(stderr: str) -> tuple[float, list[tuple[str, float]]]:
+    """-X importtime 출력 → (최상위 import 누적 합계 ms, 최상위 모듈별 누적 ms)."""
+    top = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # 헤더 줄
+        name = parts[2]
+        # 들여쓰기 없는 모듈 = 최상위 import (하위 import 는 누적 시간에 이미 포함)
+        if name.startswith(" ") and not name.startswith("  "):
+            top.append((name.strip(), int(parts[1]) / 1000.0))
+    return sum(ms for _, ms in top), top
+
+
+def measure(args: list[str]) -> dict:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=str(PROJECT_ROOT),
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+    wall_ms = (time.perf_counter() - start) * 1000.0
+    import_ms, top = parse_importtime(proc.stderr)
+    return {"wall_ms": wall_ms, "import_ms": import_ms, "top": top, "returncode": proc.returncode}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="진입점별 기동 시간 (python -X importtime)")
+    parser.add_argument("--runs", type=int, default=5, help="진입점마다 반복 횟수 (첫 회 = 콜드 스타트)")
+    parser.add_argument("--top", type=int, default=8, help="느린 최상위 import 몇 개까지 출력할지")
+    parser.add_argument("--only", action="append", default=None, help="이 이름의 진입점만 (여러 번 지정 가능)")
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    results = {}
+    for name, entry_args in ENTRY_POINTS.items():
+        if args.only and name not in args.only:
+            continue
+        runs = [measure(entry_args) for _ in range(args.runs)]
+        walls = [r["wall_ms"] for r in runs]
+        imports = [r["import_ms"] for r in runs]
+        slowest = sorted(runs[-1]["top"], key=lambda x: -x[1])[: args.top]
+        results[name] = {
+            "cold_wall_ms": round(walls[0], 1),
+            "warm_wall_ms_median": round(statistics.median(walls[1:] or walls), 1),
+            "cold_import_ms": round(imports[0], 1),
+            "warm_import_ms_median": round(statistics.median(imports[1:] or imports), 1),
+            "returncode": runs[-1]["returncode"],
+            "slowest_imports": [{"module": m, "cumulative_ms": round(ms, 1)} for m, ms in slowest],
+        }
+        r = results[name]
+        print(
+            f"{name:28s} cold {r['cold_wall_ms']:8.1f} ms (import {r['cold_import_ms']:7.1f})"
+            f" | warm {r['warm_wall_ms_median']:8.1f} ms (import {r['warm_import_ms_median']:7.1f})"
+            f"{'' if r['returncode'] == 0 else '  [종료 코드 ' + str(r['returncode']) + ']'}"
+        )
+        for item in r["slowest_imports"]:
+            print(f"    {item['cumulative_ms']:8.1f} ms  {item['module']}")
+
+    if args.out:
+        Path(args.out).write_text(
+            json.dumps({"python": sys.version.split()[0], "runs": args.runs, "entry_points": results},
+                       ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+        print(f"[벤치] 결과 저장: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+수집 단계 3: AI 두뇌 (CLIP 모델)
+torch / transformers 는 이 모듈에서만 import. 가중치는 로컬 캐시(HF 캐시 또는 CLIP_MODEL_DIR)의
+safetensors 를 먼저 찾아 네트워크 없이 로딩 (safetensors 는 mmap 으로 읽어 float32 복사가 한 번뿐).
+"""
+import os
+import threading
+
+import numpy as np
+import torch
+from PIL import Image
+from transformers import CLIPModel, CLIPProcessor
+
+from clip_backends import make_backend, set_threads
+from clip_preprocess import ClipPreprocessor
+
+# CLIP_MODEL_DIR 에 미리 받아 둔 폴더(save_pretrained 결과)를 지정하면 허브 이름 대신 사용
+MODEL_NAME = os.environ.get("CLIP_MODEL_DIR") or "openai/clip-vit-base-patch32"
+
+
+def load_pretrained(cls, name: str, **kwargs):
+    """로컬 캐시에서만 먼저 로딩 (HEAD 요청 등 네트워크 접근 없음). 캐시에 없을 때만 다운로드."""
+    try:
+        return cls.from_pretrained(name, local_files_only=True, **kwargs)
+    except OSError:
+        print(f"[CLIP] 로컬 캐시에 {name} 없음 → 다운로드 (최초 1회)")
+        return cls.from_pretrained(name, **kwargs)
+
+
+class Brain:
+    MODEL_NAME = MODEL_NAME
+
+    def __init__(self, backend: str = "torch", quantize: bool = False, threads: int | None = None,
+                 model=None, processor=None, model_name: str | None = None):
+        """model/processor 를 넘기면 로딩 대신 그대로 사용 (벤치마크용 작은 CLIP 등).
+        processor 가 없으면 텍스트 점수(set_prompts)는 쓸 수 없고 이미지 전처리는 모델 설정 크기로 함."""
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.model_name = model_name or self.MODEL_NAME
+        print(f"[CLIP] AI 모델 로딩 중... ({self.device}, backend={backend}{', int8' if quantize else ''})")
+        set_threads(threads)
+        if model is None:
+            model = load_pretrained(CLIPModel, self.model_name, use_safetensors=True)
+            try:
+                processor = load_pretrained(CLIPProcessor, self.model_name, tokenizer_kwargs={"use_fast": True})
+            except TypeError:
+                processor = load_pretrained(CLIPProcessor, self.model_name)
+        self.model = model.to(self.device).eval()
+        self.processor = processor
+        self.backend = make_backend(
+            backend, self.model, self.device, quantize=quantize, threads=threads, model_name=self.model_name,
+            image_size=self.model.config.vision_config.image_size,
+        )
+        if processor is not None:
+            self.preprocess = ClipPreprocessor.from_processor(processor)
+        else:
+            size = self.model.config.vision_config.image_size
+            self.preprocess = ClipPreprocessor(size=size, crop_size=size)
+        # preprocess 는 미리 잡아 둔 버퍼의 view 를 돌려주므로 (대시보드처럼) 여러 스레드가 같은 Brain 을 쓰면
+        # 다음 호출이 추론 중인 입력을 덮어씀 → 전처리부터 추론 끝까지 한 번에 한 배치만
+        self._batch_lock = threading.Lock()
+
+    def get_embedding(self, image: Image.Image) -> np.ndarray:
+        return self.get_embeddings([image])[0]
+
+    def get_embeddings(self, images: list) -> np.ndarray:
+        """PIL 이미지 여러 장 → (N, D) 임베딩 (CLIPProcessor 경로). 비전 타워는 선택한 백엔드로 실행."""
+        pixel_values = self.processor(images=images, return_tensors="pt")["pixel_values"]
+        return self.backend.image_features(pixel_values)
+
+    def get_embeddings_bgr(self, images_bgr: list) -> np.ndarray:
+        """cv2.imdecode 결과(BGR) 여러 장 → (N, D) 임베딩. PIL/CLIPProcessor 없이 OpenCV 배치 전처리."""
+        with self._batch_lock:
+            return self.backend.image_features(self.preprocess(images_bgr))
+
+    def get_text_embedding(self, text: str) -> np.ndarray:
+        """텍스트 → CLIP 텍스트 임베딩 (이미지 임베딩과 같은 공간, 검색용)."""
+        return self._encode_texts([text])[0]
+
+    def _encode_texts(self, texts: list[str]) -> np.ndarray:
+        inputs = self.processor(text=texts, return_tensors="pt", padding=True, truncation=True).to(self.device)
+        with torch.no_grad():
+            outputs = self.model.get_text_features(**inputs)
+        return outputs.cpu().numpy()
+
+    def set_prompts(self, prompt: str, negatives=()) -> None:
+        """검색어(+네거티브 프롬프트)를 한 번만 인코딩해 (P, D) 행렬로 캐시. 0행 = 검색어."""
+        T = self._encode_texts([prompt, *negatives])
+        self.prompt_matrix = (T / np.linalg.norm(T, axis=1, keepdims=True)).astype(np.float32)
+
+    def score(self, X: np.ndarray) -> np.ndarray:
+        """이미지 임베딩 (N, D) → 텍스트 점수 (N,). 행렬곱 한 번.
+        점수 = cos(이미지, 검색어) - max cos(이미지, 네거티브) (네거티브 없으면 검색어 유사도만)."""
+        X = np.atleast_2d(X).astype(np.float32, copy=False)
+        X = X / np.linalg.norm(X, axis=1, keepdims=True)
+        S = X @ self.prompt_matrix.T
+        if S.shape[1] == 1:
+            return S[:, 0]
+        return S[:, 0] - S[:, 1:].max(axis=1)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""OpenCV 전처리(ClipPreprocessor)와 CLIPProcessor 출력 수치 비교. 전처리를 바꾼 뒤 확인용.
+
+예) python tools/check_clip_preprocess.py                       # 다양한 크기의 합성 이미지
+    python tools/check_clip_preprocess.py data/naver_collected/<job_id> --embed
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image
+from transformers import CLIPProcessor
+
+from brain import MODEL_NAME, load_pretrained
+from clip_preprocess import ClipPreprocessor
+
+# 보간 방식 차이(PIL bicubic vs OpenCV area/cubic)로 픽셀 단위 오차는 남지만 평균 오차·임베딩은 거의 같아야 함
+MEAN_ABS_TOL = 0.05
+COSINE_MIN = 0.995
+
+
+def synthetic_images(n: int, seed: int = 0) -> list:
+    """가로/세로/정사각, 축소/확대가 섞인 부드러운 합성 이미지 (BGR uint8)."""
+    rng = np.random.default_rng(seed)
+    sizes = [(300, 300), (480, 640), (640, 480), (1080, 1920), (200, 150), (333, 517), (224, 224), (1000, 301)]
+    images = []
+    for i in range(n):
+        h, w = sizes[i % len(sizes)]
+        small = rng.integers(0, 256, size=(max(h // 16, 2), max(w // 16, 2), 3), dtype=np.uint8)
+        img = cv2.resize(small, (w, h), interpolation=cv2.INTER_LINEAR)
+        cv2.circle(img, (w // 2, h // 2), min(h, w) // 4, (int(rng.integers(256)), 40, 200), -1)
+        images.append(img)
+    return images
+
+
+def load_images(image_dir: Path, max_images: int) -> list:
+    images = []
+    for path in sorted(image_dir.iterdir()):
+        if path.suffix.lower() not in (".jpg", ".jpeg", ".png", ".webp"):
+            continue
+        img = cv2.imdecode(np.fromfile(str(path), np.uint8), cv2.IMREAD_COLOR)
+        if img is not None:
+            images.append(img)
+        if len(images) >= max_images:
+            break
+    return images
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ClipPreprocessor vs CLIPProcessor 수치 비교")
+    parser.add_argument("image_dir", nargs="?", default=None, help="이미지 폴더 (없으면 합성 이미지)")
+    parser.add_argument("--max_images", type=int, default=32)
+    parser.add_argument("--embed", action="store_true", help="CLIP 임베딩 코사인 유사도까지 비교")
+    args = parser.parse_args()
+
+    images = load_images(Path(args.image_dir), args.max_images) if args.image_dir else synthetic_images(args.max_images)
+    if not images:
+        print("[오류] 비교할 이미지가 없습니다.")
+        return 1
+
+    processor = load_pretrained(CLIPProcessor, MODEL_NAME)
+    ref = processor(
+        images=[Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB)) for img in images], return_tensors="np"
+    )["pixel_values"].astype(np.float32)
+    fast = ClipPreprocessor.from_processor(processor)(images).copy()
+
+    if ref.shape != fast.shape:
+        print(f"[실패] shape 불일치: CLIPProcessor {ref.shape} vs ClipPreprocessor {fast.shape}")
+        return 1
+    diff = np.abs(ref - fast)
+    per_image = diff.reshape(len(images), -1).mean(axis=1)
+    print(f"[비교] 이미지 {len(images)}장, shape={ref.shape}")
+    print(f"  평균 절대 오차: {diff.mean():.5f} (이미지별 최대 {per_image.max():.5f}, 허용 {MEAN_ABS_TOL})")
+    print(f"  최대 절대 오차: {diff.max():.5f}")
+    ok = bool(per_image.max() <= MEAN_ABS_TOL)
+
+    if args.embed:
+        import torch
+        from transformers import CLIPModel
+
+        model = load_pretrained(CLIPModel, MODEL_NAME, use_safetensors=True).eval()
+        with torch.no_grad():
+            a = model.get_image_features(pixel_values=torch.from_numpy(ref)).numpy()
+            b = model.get_image_features(pixel_values=torch.from_numpy(fast)).numpy()
+        cos = np.sum(a * b, axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+        print(f"  임베딩 코사인: 평균 {cos.mean():.5f}, 최소 {cos.min():.5f} (허용 {COSINE_MIN})")
+        ok = ok and bool(cos.min() >= COSINE_MIN)
+
+    print("[결과] 통과" if ok else "[결과] 실패 — 허용 오차 초과")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,29 @@
 #!/usr/bin/env python3
 """네이버 이미지 크롤만 테스트 (CLIP/저장 없음). 수집이 안 될 때 원인 확인용."""
+import argparse
 import sys
+import time
 import urllib.parse
 from pathlib import Path
 
 # 프로젝트 루트
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-import time
-
 def main():
-    query = sys.argv[1] if len(sys.argv) > 1 else "아자핑"
+    parser = argparse.ArgumentParser(description="네이버 이미지 크롤만 테스트 (CLIP/저장 없음)")
+    parser.add_argument("query", nargs="?", default="아자핑", help="검색어 (기본: 아자핑)")
+    query = parser.parse_args().query
     print(f"[테스트] 네이버 이미지 검색: '{query}' (크롤만, 저장 없음)\n")
 
+    # selenium 은 인자 확인 후에 import (--help 는 바로 끝나도록)
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    from naver_crawl import SELECTORS
+
     options = Options()
     options.add_argument("--headless=new")
     options.add_argument("--no-sandbox")
@@ -30,21 +36,7 @@ def main():
     time.sleep(3)
 
     # 각 셀렉터별로 몇 개 나오는지 출력
-    selectors = [
-        ".image_tile_item img",
-        "img._image._listImage",
-        "img._img",
-        ".photowall img",
-        "div.photowall._photoGridWrapper img",
-        ".photo_bx img",
-        "a.thumb._thumb img",
-        "#_sau_imageTab img[data-lazy-src]",
-        "#_sau_imageTab img[data-source]",
-        "#_sau_imageTab img[src*='http']",
-        "img[data-lazy-src]",
-        "img[data-source]",
-        "img[src^='https://']",
-    ]
+    selectors = list(SELECTORS)
     for sel in selectors:
         try:
             el = driver.find_elements(By.CSS_SELECTOR, sel)
@@ -0,0 +1,161 @@
+"""
+CLIP 비전 타워 추론 백엔드 (Brain 에서 사용)
+- torch       : 기본 eager PyTorch (float32, 선택 시 동적 int8 양자화)
+- torchscript : torch.jit.trace + freeze 로 최적화한 그래프
+- onnx        : ONNX 로 내보낸 뒤 ONNX Runtime (선택 시 int8 동적 양자화 모델)
+GPU 없는 수집 서버용. 텍스트 타워는 검색어당 한 번만 쓰므로 Brain 이 그대로 eager 로 돌림.
+"""
+import copy
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import torch
+
+BACKENDS = ("torch", "torchscript", "onnx")
+DEFAULT_CACHE_DIR = Path(os.environ.get("CLIP_CACHE_DIR", Path.home() / ".cache" / "cv-dataset-builder"))
+# 내보내기·양자화 코드를 바꾸면 올려서 예전 캐시를 쓰지 않게 함
+ONNX_EXPORT_VERSION = 1
+
+
+class VisionTower(torch.nn.Module):
+    """pixel_values (N,3,H,W) → 이미지 임베딩 (N,D). CLIPModel.get_image_features 와 같은 계산."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.vision_model = model.vision_model
+        self.visual_projection = model.visual_projection
+
+    def forward(self, pixel_values):
+        pooled = self.vision_model(pixel_values=pixel_values, return_dict=False)[1]
+        return self.visual_projection(pooled)
+
+
+def set_threads(threads: int | None) -> None:
+    """CPU 추론 스레드 수 (None 이면 라이브러리 기본값)."""
+    if threads:
+        torch.set_num_threads(threads)
+
+
+def _quantize(tower: torch.nn.Module) -> torch.nn.Module:
+    """Linear 레이어 동적 int8 양자화 (원본 모델은 건드리지 않음)."""
+    quantize_dynamic = getattr(torch.ao.quantization, "quantize_dynamic", None) or torch.quantization.quantize_dynamic
+    return quantize_dynamic(copy.deepcopy(tower).cpu(), {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class TorchBackend:
+    name = "torch"
+
+    def __init__(self, model, device: str, quantize: bool = False, **_):
+        self.device = device
+        tower = VisionTower(model).eval()
+        if quantize:
+            if device != "cpu":
+                print("[CLIP] int8 동적 양자화는 CPU 전용이라 CPU 로 실행합니다.")
+                self.device = "cpu"
+            tower = _quantize(tower)
+        self.tower = tower
+
+    def image_features(self, pixel_values) -> np.ndarray:
+        if isinstance(pixel_values, np.ndarray):
+            pixel_values = torch.from_numpy(pixel_values)
+        with torch.inference_mode():
+            out = self.tower(pixel_values.to(self.device))
+        return out.float().cpu().numpy()
+
+
+class TorchScriptBackend(TorchBackend):
+    name = "torchscript"
+
+    def __init__(self, model, device: str, quantize: bool = False, image_size: int = 224, **_):
+        super().__init__(model, device, quantize=quantize)
+        example = torch.zeros(1, 3, image_size, image_size, device=self.device)
+        with torch.inference_mode():
+            traced = torch.jit.trace(self.tower, example, check_trace=False)
+        try:
+            traced = torch.jit.optimize_for_inference(torch.jit.freeze(traced.eval()))
+        except Exception as e:  # 양자화 모듈 등 freeze 미지원 시 trace 결과 그대로 사용
+            print(f"[CLIP] TorchScript freeze 생략: {e}")
+        self.tower = traced
+
+
+def model_fingerprint(model, image_size: int) -> str:
+    """비전 타워 가중치·설정·입력 크기·내보내기 버전 해시 (ONNX 캐시 파일명에 사용).
+    같은 model_name 이라도 CLIP_MODEL_DIR 의 가중치가 바뀌거나 랜덤 초기화 모델이면 다른 캐시가 됨."""
+    h = hashlib.sha1()
+    h.update(json.dumps({
+        "export": ONNX_EXPORT_VERSION,
+        "torch": torch.__version__,
+        "image_size": image_size,
+        "config": model.config.vision_config.to_dict(),
+        "projection_dim": model.config.projection_dim,
+    }, sort_keys=True, default=str).encode("utf-8"))
+    for module in (model.vision_model, model.visual_projection):
+        for name, tensor in module.state_dict().items():
+            h.update(name.encode("utf-8"))
+            h.update(tensor.detach().cpu().contiguous().view(torch.uint8).numpy())
+    return h.hexdigest()[:12]
+
+
+class OnnxBackend:
+    name = "onnx"
+
+    def __init__(self, model, device: str, quantize: bool = False, threads: int | None = None,
+                 image_size: int = 224, cache_dir: Path | None = None, model_name: str = "clip", **_):
+        import onnxruntime as ort
+
+        cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        slug = f"{model_name.replace('/', '--')}.{model_fingerprint(model, image_size)}"
+        fp32_path = cache_dir / f"{slug}.vision.onnx"
+        if not fp32_path.exists():
+            print(f"[CLIP] ONNX 내보내기: {fp32_path}")
+            tower = VisionTower(model).eval().cpu()
+            example = torch.zeros(1, 3, image_size, image_size)
+            torch.onnx.export(
+                tower,
+                (example,),
+                str(fp32_path),
+                input_names=["pixel_values"],
+                output_names=["image_embeds"],
+                dynamic_axes={"pixel_values": {0: "batch"}, "image_embeds": {0: "batch"}},
+                opset_version=17,
+            )
+        path = fp32_path
+        if quantize:
+            path = cache_dir / f"{slug}.vision.int8.onnx"
+            if not path.exists():
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+
+                print(f"[CLIP] ONNX int8 동적 양자화: {path}")
+                quantize_dynamic(str(fp32_path), str(path), weight_type=QuantType.QInt8)
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            opts.intra_op_num_threads = threads
+        providers = ["CPUExecutionProvider"]
+        if device == "cuda" and not quantize and "CUDAExecutionProvider" in ort.get_available_providers():
+            providers.insert(0, "CUDAExecutionProvider")
+        self.session = ort.InferenceSession(str(path), sess_options=opts, providers=providers)
+        self.path = path
+
+    def image_features(self, pixel_values) -> np.ndarray:
+        if isinstance(pixel_values, torch.Tensor):
+            pixel_values = pixel_values.cpu().numpy()
+        pixel_values = np.ascontiguousarray(pixel_values, dtype=np.float32)
+        return self.session.run(["image_embeds"], {"pixel_values": pixel_values})[0]
+
+
+def make_backend(name: str, model, device: str, quantize: bool = False, threads: int | None = None, **kwargs):
+    """이름으로 백엔드 생성. model 은 로딩된 CLIPModel (원본은 변경하지 않음)."""
+    set_threads(threads)
+    if name == "torch":
+        return TorchBackend(model, device, quantize=quantize, **kwargs)
+    if name == "torchscript":
+        return TorchScriptBackend(model, device, quantize=quantize, **kwargs)
+    if name == "onnx":
+        return OnnxBackend(model, device, quantize=quantize, threads=threads, **kwargs)
+    raise ValueError(f"알 수 없는 백엔드: {name} (가능: {', '.join(BACKENDS)})")
@@ -0,0 +1,64 @@
+"""
+CLIP 입력 전처리 (OpenCV + NumPy, PIL/CLIPProcessor 없이)
+cv2.imdecode 결과(BGR uint8)에서 바로 짧은 변 리사이즈 → 가운데 크롭 → 미리 잡아 둔 배치 버퍼에 복사,
+정규화·BGR→RGB·NCHW 변환은 배치 전체에 채널당 한 번씩만 수행.
+CLIPImageProcessor 와 같은 규칙 (짧은 변 = size, 긴 변 = int(size * 긴 변 / 짧은 변), 크롭 위치 = (차이) // 2).
+"""
+import cv2
+import numpy as np
+
+CLIP_MEAN = (0.48145466, 0.4578275, 0.40821073)
+CLIP_STD = (0.26862954, 0.26130258, 0.27577711)
+
+
+class ClipPreprocessor:
+    def __init__(self, size: int = 224, crop_size: int = 224, mean=CLIP_MEAN, std=CLIP_STD, max_batch: int = 32):
+        self.size = size
+        self.crop_size = crop_size
+        # (x / 255 - mean) / std  ==  x * scale + bias
+        std = np.asarray(std, dtype=np.float32)
+        self.scale = (1.0 / (255.0 * std)).astype(np.float32)
+        self.bias = (-np.asarray(mean, dtype=np.float32) / std).astype(np.float32)
+        self._alloc(max_batch)
+
+    @classmethod
+    def from_processor(cls, processor, max_batch: int = 32) -> "ClipPreprocessor":
+        """CLIPProcessor(또는 CLIPImageProcessor) 설정값을 그대로 사용."""
+        ip = getattr(processor, "image_processor", processor)
+        size = ip.size.get("shortest_edge", 224) if isinstance(ip.size, dict) else int(ip.size)
+        crop = ip.crop_size.get("height", 224) if isinstance(ip.crop_size, dict) else int(ip.crop_size)
+        return cls(size=size, crop_size=crop, mean=ip.image_mean, std=ip.image_std, max_batch=max_batch)
+
+    def _alloc(self, n: int) -> None:
+        c = self.crop_size
+        self._u8 = np.empty((n, c, c, 3), dtype=np.uint8)
+        self._out = np.empty((n, 3, c, c), dtype=np.float32)
+
+    def resize_crop(self, img_bgr: np.ndarray) -> np.ndarray:
+        """짧은 변 리사이즈 + 가운데 크롭 (crop_size x crop_size BGR 뷰, 복사 없음)."""
+        h, w = img_bgr.shape[:2]
+        short, long = (w, h) if w <= h else (h, w)
+        new_short, new_long = self.size, int(self.size * long / short)
+        new_w, new_h = (new_short, new_long) if w <= h else (new_long, new_short)
+        # 축소는 INTER_AREA (PIL bicubic 의 안티앨리어싱과 가까움), 확대는 INTER_CUBIC
+        interp = cv2.INTER_AREA if new_w < w else cv2.INTER_CUBIC
+        resized = cv2.resize(img_bgr, (new_w, new_h), interpolation=interp)
+        top = max((new_h - self.crop_size) // 2, 0)
+        left = max((new_w - self.crop_size) // 2, 0)
+        return resized[top:top + self.crop_size, left:left + self.crop_size]
+
+    def __call__(self, images_bgr: list) -> np.ndarray:
+        """BGR uint8 이미지 목록 → (N, 3, crop, crop) float32 pixel_values.
+        반환 배열은 내부 버퍼의 뷰라서 다음 호출 때 덮어써짐 (바로 추론에 넘기는 용도)."""
+        n = len(images_bgr)
+        if n > self._u8.shape[0]:
+            self._alloc(n)
+        u8 = self._u8[:n]
+        for i, img in enumerate(images_bgr):
+            u8[i] = self.resize_crop(img)
+        out = self._out[:n]
+        # BGR → RGB 를 채널 인덱스로 처리하면서 정규화 결과를 NCHW 버퍼에 바로 기록
+        for c in range(3):
+            np.multiply(u8[..., 2 - c], self.scale[c], out=out[:, c], dtype=np.float32)
+            out[:, c] += self.bias[c]
+        return out
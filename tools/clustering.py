@@ -0,0 +1,21 @@
+"""
+수집 단계 4: CLIP 임베딩 DBSCAN 클러스터링 → '진짜 검색어' 그룹 선택
+"""
+import numpy as np
+from sklearn.cluster import DBSCAN
+
+
+def pick_best_cluster(X, scores=None, eps=0.18, min_samples=3):
+    """DBSCAN(cosine) 후 가장 큰 클러스터 선택. 크기가 같으면 텍스트 점수 평균이 높은 쪽.
+    (라벨, 해당 인덱스 배열) 반환. 노이즈만 있으면 (None, None)."""
+    labels = DBSCAN(eps=eps, min_samples=min_samples, metric='cosine').fit(X).labels_
+    unique_labels = set(labels)
+    if -1 in unique_labels: unique_labels.remove(-1) # 노이즈 제거
+    if not unique_labels:
+        return None, None
+    label_list = list(labels)
+    if scores is None:
+        best_label = max(unique_labels, key=label_list.count)
+    else:
+        best_label = max(unique_labels, key=lambda l: (label_list.count(l), float(scores[labels == l].mean())))
+    return best_label, np.flatnonzero(labels == best_label)
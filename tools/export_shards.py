@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+수집 결과 → 학습용 샤드 (WebDataset 형식 tar + 임의 접근용 index.json)
+작업 폴더의 manifest.jsonl 순서대로 샘플마다 <key>.jpg / <key>.json (메타데이터·품질 점수·URL) / <key>.npy (CLIP 임베딩)
+를 연속으로 묶어 shards/shard-000000.tar, ... 에 씀. 샤드는 --shard_size_mb 를 넘기 전에 끊음.
+index.json 에 샘플별 (샤드, 바이트 오프셋, 크기)를 적어 두어 tar 를 처음부터 읽지 않고 seek 한 번으로 꺼낼 수 있음.
+
+예) python tools/export_shards.py data/naver_collected/<job_id> --shard_size_mb 64
+    webdataset: wds.WebDataset("data/naver_collected/<job_id>/shards/shard-{000000..000003}.tar")
+"""
+import argparse
+import io
+import json
+import sys
+import tarfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+SHARDS_DIR = "shards"
+INDEX_FILE = "index.json"
+INDEX_VERSION = 1
+DEFAULT_SHARD_SIZE_MB = 256
+TAR_BLOCK = 512
+
+
+def _tar_size(n: int) -> int:
+    """멤버 하나가 tar 에서 차지하는 바이트 (헤더 + 512 단위로 채운 본문)."""
+    return TAR_BLOCK + (n + TAR_BLOCK - 1) // TAR_BLOCK * TAR_BLOCK
+
+
+def _closed_size(n: int) -> int:
+    """tar.close() 후 파일 크기: 끝 표시까지 n 바이트를 RECORDSIZE(10240) 단위로 채움."""
+    return -(-n // tarfile.RECORDSIZE) * tarfile.RECORDSIZE
+
+
+def _source_stamp(job_dir: Path) -> dict:
+    st = (job_dir / "manifest.jsonl").stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def read_manifest(job_dir: Path) -> list[dict]:
+    lines = (job_dir / "manifest.jsonl").read_text(encoding="utf-8").splitlines()
+    return [json.loads(line) for line in lines if line.strip()]
+
+
+def load_index(job_dir) -> dict | None:
+    path = Path(job_dir) / SHARDS_DIR / INDEX_FILE
+    if not path.is_file():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def is_current(job_dir, shard_size_mb: float | None = None) -> bool:
+    """샤드가 있고 그 뒤로 manifest.jsonl 이 바뀌지 않았는지. shard_size_mb 를 주면 그 크기로 만든 것인지도 확인."""
+    job_dir = Path(job_dir)
+    index = load_index(job_dir)
+    if index is None or index.get("version") != INDEX_VERSION or not (job_dir / "manifest.jsonl").is_file():
+        return False
+    if shard_size_mb is not None and index.get("shard_size_mb") != shard_size_mb:
+        return False
+    return index.get("source") == _source_stamp(job_dir)
+
+
+def _quality_for(meta: dict, image_path: Path) -> dict:
+    """manifest 에 품질 점수가 없는 예전 작업은 저장된 JPEG 로 다시 계산."""
+    if "sharpness" in meta:
+        return {k: meta.get(k) for k in ("width", "height", "sharpness")}
+    import cv2
+    from image_io import quality_metrics
+
+    img = cv2.imdecode(np.fromfile(str(image_path), np.uint8), cv2.IMREAD_COLOR)
+    return quality_metrics(img) if img is not None else {}
+
+
+def _npy_bytes(vec: np.ndarray) -> bytes:
+    buf = io.BytesIO()
+    np.save(buf, np.asarray(vec, dtype=np.float32))
+    return buf.getvalue()
+
+
+class _ShardWriter:
+    """샤드 tar 를 순서대로 씀. 멤버별 본문 바이트 오프셋을 기록."""
+
+    def __init__(self, shard_dir: Path, max_bytes: int):
+        self.shard_dir = shard_dir
+        self.max_bytes = max_bytes
+        self.shards: list[dict] = []
+        self._tar = None
+        self._file = None
+
+    def _open(self) -> None:
+        name = f"shard-{len(self.shards):06d}.tar"
+        self._file = (self.shard_dir / (name + ".tmp")).open("wb")
+        self._tar = tarfile.open(fileobj=self._file, mode="w", format=tarfile.USTAR_FORMAT)
+        self.shards.append({"name": name, "samples": 0, "size": 0})
+
+    def _close(self) -> None:
+        if self._tar is None:
+            return
+        self._tar.close()  # 끝 표시(빈 블록 2개) + 레코드 크기로 채움
+        self._file.close()
+        shard = self.shards[-1]
+        shard["size"] = (self.shard_dir / (shard["name"] + ".tmp")).stat().st_size
+        self._tar = self._file = None
+
+    def add_sample(self, key: str, members: list[tuple[str, int, object]], mtime: float) -> dict:
+        """members: (확장자, 크기, 바이트 또는 파일 경로). 샘플은 샤드 경계를 넘지 않음."""
+        need = sum(_tar_size(size) for _, size, _ in members) + 2 * TAR_BLOCK  # 끝 표시 블록 포함
+        if self._tar is None or (self.shards[-1]["samples"] and _closed_size(self._file.tell() + need) > self.max_bytes):
+            self._close()
+            self._open()
+        entry = {}
+        for ext, size, data in members:
+            info = tarfile.TarInfo(f"{key}.{ext}")
+            info.size = size
+            info.mtime = int(mtime)
+            info.mode = 0o644
+            if isinstance(data, Path):
+                with data.open("rb") as f:  # JPEG 는 메모리에 올리지 않고 복사
+                    self._tar.addfile(info, f)
+            else:
+                self._tar.addfile(info, io.BytesIO(data))
+            # addfile 뒤 tar.offset = 본문 시작 + 512 단위로 채운 본문 크기
+            entry[ext] = [self._tar.offset - (_tar_size(size) - TAR_BLOCK), size]
+        self.shards[-1]["samples"] += 1
+        return entry
+
+    def finish(self) -> None:
+        self._close()
+
+    def commit(self) -> None:
+        """다 쓴 .tmp 를 실제 이름으로 교체. 다운로드 중인 이전 샤드는 열린 파일이라 끝까지 읽힘."""
+        for shard in self.shards:
+            (self.shard_dir / (shard["name"] + ".tmp")).replace(self.shard_dir / shard["name"])
+
+
+def export_shards(job_dir, shard_size_mb: float = DEFAULT_SHARD_SIZE_MB, out_dir=None) -> dict:
+    """작업 폴더 → <out_dir 또는 job_dir/shards>/shard-*.tar + index.json. index 딕셔너리 반환."""
+    job_dir = Path(job_dir)
+    shard_dir = Path(out_dir) if out_dir else job_dir / SHARDS_DIR
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    source = _source_stamp(job_dir)
+    manifest = read_manifest(job_dir)
+
+    emb_path = job_dir / "embeddings.npy"
+    embeddings = np.load(emb_path, mmap_mode="r") if emb_path.is_file() else None
+    if embeddings is not None and len(embeddings) != len(manifest):
+        print(f"[경고] embeddings.npy 행 수({len(embeddings)})가 manifest({len(manifest)})와 달라 임베딩은 제외합니다.")
+        embeddings = None
+
+    # 중단된 내보내기가 남긴 임시 파일 정리. 이전 샤드는 새 샤드를 다 쓴 뒤에 교체
+    for tmp in shard_dir.glob("shard-*.tar.tmp"):
+        tmp.unlink()
+
+    writer = _ShardWriter(shard_dir, int(shard_size_mb * 1024 * 1024))
+    samples = []
+    try:
+        for i, meta in enumerate(manifest):
+            image_path = job_dir / meta["file"]
+            if not image_path.is_file():
+                continue
+            key = f"{i:06d}"
+            info = {**meta, "key": key, **_quality_for(meta, image_path)}
+            info_bytes = json.dumps(info, ensure_ascii=False).encode("utf-8")
+            members = [("jpg", image_path.stat().st_size, image_path), ("json", len(info_bytes), info_bytes)]
+            if embeddings is not None:
+                vec_bytes = _npy_bytes(embeddings[i])
+                members.append(("npy", len(vec_bytes), vec_bytes))
+            entry = writer.add_sample(key, members, image_path.stat().st_mtime)
+            samples.append({"key": key, "file": meta["file"], "shard": len(writer.shards) - 1, "members": entry})
+    finally:
+        writer.finish()
+
+    # 이전 index → 샤드 교체 → 남는 이전 샤드 삭제 → 새 index 순서 (오래된 index 와 새 샤드가 섞여 보이지 않도록)
+    (shard_dir / INDEX_FILE).unlink(missing_ok=True)
+    writer.commit()
+    names = {shard["name"] for shard in writer.shards}
+    for old in shard_dir.glob("shard-*.tar"):
+        if old.name not in names:
+            old.unlink()
+
+    index = {
+        "version": INDEX_VERSION,
+        "format": "webdataset",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "query": manifest[0].get("query") if manifest else None,
+        "source": source,
+        "shard_size_mb": shard_size_mb,
+        "embedding_dim": int(embeddings.shape[1]) if embeddings is not None else None,
+        "shards": writer.shards,
+        "samples": samples,
+    }
+    tmp = shard_dir / (INDEX_FILE + ".tmp")
+    tmp.write_text(json.dumps(index, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(shard_dir / INDEX_FILE)
+    return index
+
+
+def read_member(shard_dir, index: dict, sample: dict, ext: str = "jpg") -> bytes:
+    """index.json 의 샘플 항목 → 해당 멤버 바이트 (샤드에서 seek 한 번).
+    index 는 load_index / export_shards 결과를 한 번 읽어 두고 재사용 (샘플마다 index.json 을 다시 읽지 않음)."""
+    offset, size = sample["members"][ext]
+    with (Path(shard_dir) / index["shards"][sample["shard"]]["name"]).open("rb") as f:
+        f.seek(offset)
+        return f.read(size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="수집 결과 → WebDataset 형식 tar 샤드 + index.json")
+    parser.add_argument("job_dir", help="작업 폴더 (manifest.jsonl 이 있는 곳)")
+    parser.add_argument("--shard_size_mb", type=float, default=DEFAULT_SHARD_SIZE_MB, help="샤드 하나의 최대 크기")
+    parser.add_argument("--out_dir", default=None, help="샤드 저장 폴더 (기본: <job_dir>/shards)")
+    parser.add_argument("--check", action="store_true", help="내보낸 뒤 index 오프셋으로 모든 샘플을 다시 읽어 확인")
+    args = parser.parse_args()
+
+    job_dir = Path(args.job_dir)
+    if not (job_dir / "manifest.jsonl").is_file():
+        print(f"[오류] manifest.jsonl 이 없습니다: {job_dir}")
+        return 1
+    index = export_shards(job_dir, args.shard_size_mb, args.out_dir)
+    total = sum(s["size"] for s in index["shards"])
+    print(f"[샤드] {len(index['samples'])}개 샘플 → {len(index['shards'])}개 샤드 ({total / 1024 / 1024:.1f} MB)")
+
+    if args.check:
+        shard_dir = Path(args.out_dir) if args.out_dir else job_dir / SHARDS_DIR
+        bad = 0
+        for sample in index["samples"]:
+            bad += read_member(shard_dir, index, sample) != (job_dir / sample["file"]).read_bytes()
+        print("[확인] 통과" if not bad else f"[확인] 실패 — {bad}개 샘플 불일치")
+        return 1 if bad else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -25,183 +25,116 @@ else:
         pass
 
 import argparse
-import hashlib
 import json
+import signal
 import time
-import urllib.request
-import urllib.parse
 from pathlib import Path
-import numpy as np
-import cv2
-import torch
-from PIL import Image
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from transformers import CLIPProcessor, CLIPModel
-from sklearn.cluster import DBSCAN
-from sklearn.metrics.pairwise import cosine_similarity
-
-# --- 1. 네이버 이미지 수집기 (Selenium) ---
-def crawl_naver_images(query, limit=100):
-    print(f"[검색] 네이버에서 '{query}' 검색 중...")
-    
-    options = Options()
-    options.add_argument("--headless=new") # 창 안 띄우고 실행
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-gpu")
-    
-    # 크롬 드라이버 자동 설치 및 실행
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    
-    search_url = f"https://search.naver.com/search.naver?where=image&query={urllib.parse.quote(query)}"
-    driver.get(search_url)
-    time.sleep(2.0)  # 초기 이미지 로딩 대기
-
-    # 스크롤 내리기 (이미지 로딩)
-    for _ in range(5):
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(1.2)
-    last_height = driver.execute_script("return document.body.scrollHeight")
-    for _ in range(10):
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(1.0)
-        new_height = driver.execute_script("return document.body.scrollHeight")
-        if new_height == last_height:
-            break
-        last_height = new_height
-
-    # 이미지 태그 찾기 (네이버 구조 변경 대비 여러 셀렉터 시도)
-    images = []
-    for selector in (
-        ".image_tile_item img",
-        "img._image._listImage",
-        "img._img",
-        ".photowall img",
-        "div.photowall._photoGridWrapper img",
-        ".photo_bx img",
-        "a.thumb._thumb img",
-        "#_sau_imageTab img[data-lazy-src]",
-        "#_sau_imageTab img[data-source]",
-        "#_sau_imageTab img[src*='http']",
-        "img[data-lazy-src]",
-        "img[data-source]",
-        "img[src^='https://']",
-    ):
-        images = driver.find_elements(By.CSS_SELECTOR, selector)
-        if images:
-            break
-    candidates = []
-    seen = set()
-    for img in images:
-        if len(candidates) >= limit * 2:
-            break
-        try:
-            src = (
-                img.get_attribute("data-lazy-src")
-                or img.get_attribute("data-src")
-                or img.get_attribute("data-source")
-                or img.get_attribute("src")
-            )
-            if src and src.startswith("http") and src not in seen:
-                seen.add(src)
-                candidates.append({"url": src, "title": query})
-        except Exception:
-            continue
-            
-    driver.quit()
-    print(f"[수집] 후보 이미지 {len(candidates)}개 발견!")
-    return candidates
-
-# --- 2. AI 두뇌 (CLIP 모델) ---
-class Brain:
-    def __init__(self):
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        print(f"[CLIP] AI 모델 로딩 중... ({self.device})")
-        self.model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32").to(self.device)
-        try:
-            self.processor = CLIPProcessor.from_pretrained(
-                "openai/clip-vit-base-patch32",
-                tokenizer_kwargs={"use_fast": True},
-            )
-        except TypeError:
-            self.processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
-
-    def get_embedding(self, image: Image.Image) -> np.ndarray:
-        inputs = self.processor(images=image, return_tensors="pt", padding=True).to(self.device)
-        with torch.no_grad():
-            outputs = self.model.get_image_features(**inputs)
-        return outputs.cpu().numpy().flatten()
-
-# --- 3. 유틸리티 (다운로드 & 변환) ---
-def download_image(url):
-    try:
-        req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
-        with urllib.request.urlopen(req, timeout=5) as resp:
-            data = resp.read()
-            nparr = np.frombuffer(data, np.uint8)
-            img_cv2 = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            img_rgb = cv2.cvtColor(img_cv2, cv2.COLOR_BGR2RGB)
-            return Image.fromarray(img_rgb), img_cv2, data
-    except:
-        return None, None, None
-
-def quality_check(img_cv2, min_size=300):
-    h, w = img_cv2.shape[:2]
-    if w < min_size or h < min_size: return False
-    gray = cv2.cvtColor(img_cv2, cv2.COLOR_BGR2GRAY)
-    blur = cv2.Laplacian(gray, cv2.CV_64F).var()
-    if blur < 50: return False # 너무 흐리면 탈락
-    return True
-
-# --- 4. 메인 로직 ---
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("query", help="검색어 (예: 아자핑)")
-    parser.add_argument("--limit", type=int, default=50)
-    parser.add_argument("--out_dir", default="data/naver_collected")
-    args = parser.parse_args()
-    
+
+from stage_metrics import JobMetrics
+
+# --- 메인 로직 ---
+def run(args, metrics):
+    # 무거운 의존성(selenium, torch, transformers, sklearn, cv2)은 각 단계 모듈을 쓸 때 import
+    import numpy as np
+
     # 1. 수집
-    candidates = crawl_naver_images(args.query, args.limit)
-    brain = Brain()
+    with metrics.stage("crawl"):
+        from naver_crawl import crawl_naver_images
+        candidates = crawl_naver_images(args.query, args.limit)
+    metrics.count("candidates", len(candidates))
+
+    with metrics.stage("model_load"):
+        import cv2
+        from brain import Brain
+        from clustering import pick_best_cluster
+        from image_io import MIN_SIZE, decode_image, fetch_bytes, quality_metrics, reject_reason
+        brain = Brain(backend=args.backend, quantize=args.quantize, threads=args.threads)
+        brain.set_prompts(args.prompt or args.query, args.negative)
     
     valid_data = []
     embeddings = []
+    low_score = 0
+    pending = []
+
+    def embed_pending():
+        # 품질 통과 이미지를 배치로 임베딩 → 텍스트 점수도 배치당 행렬곱 한 번
+        nonlocal low_score
+        if not pending:
+            return
+        start = time.perf_counter()
+        with metrics.stage("embed"):
+            vecs = brain.get_embeddings_bgr([item["cv2"] for item in pending])
+            keep = np.ones(len(pending), dtype=bool)
+            if args.min_score is not None:
+                # 텍스트 점수 조기 필터: 검색어와 거리가 먼 이미지는 클러스터링·저장 대상에서 제외
+                keep = brain.score(vecs) >= args.min_score
+                low_score += int((~keep).sum())
+        metrics.observe("embed_batch", time.perf_counter() - start)
+        metrics.count("embedded", len(pending))
+        for item, vec, ok in zip(pending, vecs, keep):
+            if ok:
+                valid_data.append(item)
+                embeddings.append(vec)
+        pending.clear()
+        print(f"\r진행률: {len(valid_data)}장 처리", end="")
     
     print("[분석] 이미지 분석 및 임베딩 추출 중...")
     for cand in candidates:
-        pil, cv2_img, raw = download_image(cand['url'])
-        if pil is None: continue
+        start = time.perf_counter()
+        with metrics.stage("download"):
+            raw = fetch_bytes(cand['url'])
+        metrics.observe("download", time.perf_counter() - start)
+        if raw is None:
+            metrics.count("download_failed")
+            continue
+        metrics.count("download_bytes", len(raw))
+        with metrics.stage("decode"):
+            cv2_img = decode_image(raw)
+        if cv2_img is None:
+            metrics.count("decode_failed")
+            continue
         
-        if not quality_check(cv2_img): continue
+        with metrics.stage("quality"):
+            quality = quality_metrics(cv2_img, MIN_SIZE)
+            reason = reject_reason(quality)
+        if reason is not None:
+            metrics.count(f"reject_{reason}")
+            continue
         
-        vec = brain.get_embedding(pil)
-        valid_data.append({"cv2": cv2_img, "url": cand['url']})
-        embeddings.append(vec)
-        print(f"\r진행률: {len(valid_data)}장 처리", end="")
+        pending.append({"cv2": cv2_img, "url": cand['url'], "quality": quality})
+        if len(pending) >= args.batch:
+            embed_pending()
+    embed_pending()
+    if low_score:
+        metrics.count("reject_low_score", low_score)
+        print(f"\n[필터] 텍스트 점수 {args.min_score} 미만 {low_score}장 제외")
         
     # 2. 클러스터링 (다수결)
     if not embeddings: return
-    X = np.array(embeddings)
-    X = X / np.linalg.norm(X, axis=1, keepdims=True)
-    
-    # DBSCAN으로 '진짜' 그룹 찾기
-    clustering = DBSCAN(eps=0.18, min_samples=3, metric='cosine').fit(X)
-    labels = clustering.labels_
-    
-    unique_labels = set(labels)
-    if -1 in unique_labels: unique_labels.remove(-1) # 노이즈 제거
+    with metrics.stage("cluster"):
+        X = np.array(embeddings)
+        X = X / np.linalg.norm(X, axis=1, keepdims=True)
+        scores = brain.score(X)
     
-    if not unique_labels:
+        # DBSCAN으로 '진짜' 그룹 찾기
+        best_label, selected = pick_best_cluster(X, scores)
+    if selected is not None:
+        metrics.count("cluster_size", len(selected))
+        print(f"\n[저장] '진짜 {args.query}' 그룹(ID:{best_label}, 텍스트 점수 평균 {scores[selected].mean():.3f}) 확정! 저장 시작...")
+    elif args.min_score is not None:
+        # 클러스터는 없지만 텍스트 점수 필터를 통과한 이미지들은 검색어와 가깝다고 보고 저장
+        selected = np.arange(len(valid_data))
+        print(f"\n[저장] DBSCAN 클러스터 없음 → 텍스트 점수 {args.min_score} 이상 {len(selected)}장으로 저장 시작...")
+    else:
         print(f"\n[경고] 뚜렷한 특징을 못 찾았습니다. (분석한 이미지 {len(valid_data)}장, DBSCAN에서 모두 노이즈로 분류됨)")
-        print("  → 수집 개수를 늘리거나(예: --limit 80), 검색 결과가 너무 다양하면 이 메시지가 나올 수 있습니다.")
+        print("  → 수집 개수를 늘리거나(예: --limit 80), --prompt/--min_score 로 텍스트 점수 필터를 쓰면 나아질 수 있습니다.")
         return
 
-    best_label = max(unique_labels, key=list(labels).count)
-    print(f"\n[저장] '진짜 {args.query}' 그룹(ID:{best_label}) 확정! 저장 시작...")
+    # --prompt/--min_score 를 준 경우만 텍스트 점수 높은 순으로 정렬 (기본 점수는 검색어 그대로라
+    # 한국어 검색어면 CLIP 텍스트 인코더 점수가 거의 의미 없음). 아니면 크롤 순서 그대로 limit 만큼
+    if args.prompt or args.min_score is not None:
+        selected = selected[np.argsort(-scores[selected], kind="stable")]
+    selected = selected[:args.limit]
     
     # 3. 저장 (폴더·파일명은 영문만 사용해 한글/인코딩 이슈 방지)
     out_path = Path(args.out_dir)
@@ -209,18 +142,80 @@ def main():
     manifest_path = out_path / "manifest.jsonl"
 
     count = 0
-    with manifest_path.open("w", encoding="utf-8") as f:
-        for i, item in enumerate(valid_data):
-            if count >= args.limit:
-                break
-            if labels[i] == best_label:
-                count += 1
-                fname = f"img_{count:04d}.jpg"
-                cv2.imwrite(str(out_path / fname), item["cv2"])
-                meta = {"query": args.query, "file": fname, "source": "naver"}
-                f.write(json.dumps(meta, ensure_ascii=False) + "\n")
-                
+    saved_vecs = []
+    with metrics.stage("write"), manifest_path.open("w", encoding="utf-8") as f:
+        for i in selected:
+            item = valid_data[i]
+            count += 1
+            fname = f"img_{count:04d}.jpg"
+            cv2.imwrite(str(out_path / fname), item["cv2"])
+            meta = {
+                "query": args.query,
+                "file": fname,
+                "source": "naver",
+                "url": item["url"],
+                "text_score": round(float(scores[i]), 4),
+                **item["quality"],
+            }
+            f.write(json.dumps(meta, ensure_ascii=False) + "\n")
+            saved_vecs.append(X[i])
+
+        # 임베딩 저장 (manifest.jsonl 과 같은 순서, L2 정규화된 float32) → 대시보드 유사 이미지 검색 인덱스가 사용
+        if saved_vecs:
+            np.save(out_path / "embeddings.npy", np.asarray(saved_vecs, dtype=np.float32))
+    metrics.count("saved", count)
+
+    if args.export_shards and count:
+        with metrics.stage("export"):
+            from export_shards import export_shards
+            index = export_shards(out_path, args.shard_size_mb)
+        print(f"[샤드] {len(index['samples'])}개 샘플 → {out_path / 'shards'} ({len(index['shards'])}개 tar)")
+
     print(f"[완료] 총 {count}장 저장됨: {out_path}")
 
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("query", help="검색어 (예: 아자핑)")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--out_dir", default="data/naver_collected")
+    parser.add_argument("--prompt", default=None, help="CLIP 텍스트 점수에 쓸 문장 (기본: 검색어. 예: 'a photo of a pink fairy character')")
+    parser.add_argument("--negative", action="append", default=[], help="네거티브 프롬프트 (여러 번 지정 가능)")
+    parser.add_argument("--min_score", type=float, default=None, help="텍스트 점수가 이 값 미만인 이미지는 임베딩 직후 제외 (기본: 제외 안 함)")
+    # clip_backends.BACKENDS 와 동일 (--help 에서 torch import 를 피하려고 그대로 적음)
+    parser.add_argument("--backend", choices=("torch", "torchscript", "onnx"), default="torch", help="CLIP 비전 타워 추론 백엔드")
+    parser.add_argument("--quantize", action="store_true", help="비전 타워 동적 int8 양자화 (CPU)")
+    parser.add_argument("--threads", type=int, default=None, help="CPU 추론 스레드 수")
+    parser.add_argument("--batch", type=int, default=16, help="CLIP 임베딩 배치 크기")
+    parser.add_argument("--export_shards", action="store_true", help="저장 후 out_dir/shards 에 학습용 tar 샤드(WebDataset 형식) + index.json 생성")
+    parser.add_argument("--shard_size_mb", type=float, default=256, help="샤드 하나의 최대 크기 (MB)")
+    parser.add_argument("--profile", action="store_true", help="cProfile 프로파일을 out_dir/profile.prof (+ profile.txt 요약)로 저장")
+    args = parser.parse_args()
+
+    # 단계별 시간·카운터는 성공/실패와 관계없이 out_dir/metrics.json 에 남김 (대시보드가 DB 로 옮김)
+    # 대시보드의 중단은 SIGTERM → SystemExit 로 바꿔 아래 finally 가 실행되게 함
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+    metrics = JobMetrics()
+    metrics.extra["args"] = {k: v for k, v in vars(args).items() if k != "query"}
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        run(args, metrics)
+    finally:
+        out_path = Path(args.out_dir)
+        if profiler is not None:
+            import pstats
+            profiler.disable()
+            out_path.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(str(out_path / "profile.prof"))
+            with (out_path / "profile.txt").open("w", encoding="utf-8") as f:
+                pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(40)
+            metrics.extra["profile"] = "profile.prof"
+        metrics.write(out_path)
+        print(f"\n[측정] {metrics.summary_line()}")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
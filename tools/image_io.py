@@ -0,0 +1,61 @@
+"""
+수집 단계 2: 이미지 다운로드·디코드, 품질 필터 (해상도·Laplacian 선명도)
+"""
+import urllib.request
+
+import cv2
+import numpy as np
+
+MIN_SIZE = 300  # 가로·세로 최소 픽셀
+MIN_SHARPNESS = 50  # Laplacian 분산 최소값
+
+
+def fetch_bytes(url):
+    """URL → 응답 바이트. 실패하면 None."""
+    try:
+        req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            return resp.read()
+    except:
+        return None
+
+
+def decode_image(data):
+    """바이트 → BGR 이미지. 이미지가 아니거나 깨졌으면 None."""
+    try:
+        return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    except:
+        return None
+
+
+def download_image(url):
+    data = fetch_bytes(url)
+    if data is None:
+        return None, None
+    img_cv2 = decode_image(data)
+    if img_cv2 is None:
+        return None, None
+    return img_cv2, data
+
+
+def quality_metrics(img_cv2, min_size=None):
+    """해상도·선명도(Laplacian 분산). manifest.jsonl / 샤드 메타데이터에 같이 저장.
+    min_size 를 주면 그보다 작은 이미지는 어차피 탈락이므로 선명도 계산(흑백 변환·Laplacian)을 생략."""
+    h, w = img_cv2.shape[:2]
+    quality = {"width": int(w), "height": int(h)}
+    if min_size is not None and (w < min_size or h < min_size):
+        return quality
+    gray = cv2.cvtColor(img_cv2, cv2.COLOR_BGR2GRAY)
+    quality["sharpness"] = round(float(cv2.Laplacian(gray, cv2.CV_64F).var()), 2)
+    return quality
+
+
+def reject_reason(quality, min_size=MIN_SIZE, min_sharpness=MIN_SHARPNESS):
+    """quality_metrics 결과 → 품질 탈락 사유 ("too_small" / "blurry"), 통과면 None."""
+    if quality["width"] < min_size or quality["height"] < min_size: return "too_small"
+    if quality["sharpness"] < min_sharpness: return "blurry" # 너무 흐리면 탈락
+    return None
+
+
+def quality_check(img_cv2, min_size=MIN_SIZE):
+    return reject_reason(quality_metrics(img_cv2, min_size), min_size) is None
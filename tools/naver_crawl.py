@@ -0,0 +1,91 @@
+"""
+수집 단계 1: 네이버 이미지 검색 (Selenium)
+selenium / webdriver_manager 는 이 모듈에서만 import — 수집기는 크롤 단계 시작 시에만 이 모듈을 불러옴.
+"""
+import os
+import time
+import urllib.parse
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+# 검색 서버 주소. 벤치마크에서는 로컬 스탠드인 서버(tools/naver_standin.py) 주소로 바꿔 씀
+NAVER_SEARCH_BASE = os.environ.get("NAVER_SEARCH_BASE", "https://search.naver.com")
+
+# 이미지 태그 셀렉터 (네이버 구조 변경 대비 여러 개, 앞에서부터 시도)
+SELECTORS = (
+    ".image_tile_item img",
+    "img._image._listImage",
+    "img._img",
+    ".photowall img",
+    "div.photowall._photoGridWrapper img",
+    ".photo_bx img",
+    "a.thumb._thumb img",
+    "#_sau_imageTab img[data-lazy-src]",
+    "#_sau_imageTab img[data-source]",
+    "#_sau_imageTab img[src*='http']",
+    "img[data-lazy-src]",
+    "img[data-source]",
+    "img[src^='https://']",
+)
+
+
+def crawl_naver_images(query, limit=100, base_url=None):
+    print(f"[검색] 네이버에서 '{query}' 검색 중...")
+    
+    options = Options()
+    options.add_argument("--headless=new") # 창 안 띄우고 실행
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-gpu")
+    
+    # 크롬 드라이버 자동 설치 및 실행
+    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    
+    base_url = (base_url or NAVER_SEARCH_BASE).rstrip("/")
+    search_url = f"{base_url}/search.naver?where=image&query={urllib.parse.quote(query)}"
+    driver.get(search_url)
+    time.sleep(2.0)  # 초기 이미지 로딩 대기
+
+    # 스크롤 내리기 (이미지 로딩)
+    for _ in range(5):
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        time.sleep(1.2)
+    last_height = driver.execute_script("return document.body.scrollHeight")
+    for _ in range(10):
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        time.sleep(1.0)
+        new_height = driver.execute_script("return document.body.scrollHeight")
+        if new_height == last_height:
+            break
+        last_height = new_height
+
+    # 이미지 태그 찾기 (네이버 구조 변경 대비 여러 셀렉터 시도)
+    images = []
+    for selector in SELECTORS:
+        images = driver.find_elements(By.CSS_SELECTOR, selector)
+        if images:
+            break
+    candidates = []
+    seen = set()
+    for img in images:
+        if len(candidates) >= limit * 2:
+            break
+        try:
+            src = (
+                img.get_attribute("data-lazy-src")
+                or img.get_attribute("data-src")
+                or img.get_attribute("data-source")
+                or img.get_attribute("src")
+            )
+            if src and src.startswith("http") and src not in seen:
+                seen.add(src)
+                candidates.append({"url": src, "title": query})
+        except Exception:
+            continue
+            
+    driver.quit()
+    print(f"[수집] 후보 이미지 {len(candidates)}개 발견!")
+    return candidates
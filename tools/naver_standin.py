@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+네이버 이미지 검색 오프라인 스탠드인 (벤치마크용 로컬 HTTP 서버)
+- /search.naver?where=image&query=... : 네이버 결과 페이지와 같은 마크업(.image_tile_item img[data-lazy-src])
+- /img/<n>.jpg                        : 미리 만든 JPEG 코퍼스 (크기 분포·흐린 이미지·깨진 응답 포함), 지연 주입
+
+예) python tools/naver_standin.py --port 8765 --images 200 --latency_ms 80
+    NAVER_SEARCH_BASE=http://127.0.0.1:8765 python tools/high_quality_image_collector.py "테스트"
+"""
+import argparse
+import html
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+# (가로, 세로) 분포. 300px 미만은 quality_check 에서 해상도로 탈락하는 몫
+DEFAULT_SIZES = ((640, 480), (800, 600), (1280, 720), (1920, 1080), (500, 750), (250, 200))
+
+
+def make_corpus(n: int, sizes=DEFAULT_SIZES, prototypes: int = 4, blur_ratio: float = 0.1,
+                seed: int = 0, quality: int = 90) -> list[bytes]:
+    """JPEG 바이트 목록. 몇 개의 원형(prototype) 변형으로 만들어 클러스터링이 잡을 구조가 있게 함."""
+    rng = np.random.default_rng(seed)
+    bases = []
+    for _ in range(prototypes):
+        small = rng.integers(0, 256, size=(6, 8, 3), dtype=np.uint8)
+        bases.append(cv2.resize(small, (256, 192), interpolation=cv2.INTER_CUBIC))
+    corpus = []
+    for i in range(n):
+        w, h = sizes[i % len(sizes)]
+        if i % 5 == 4:
+            # 어느 원형에도 속하지 않는 잡음 이미지
+            img = cv2.resize(rng.integers(0, 256, size=(24, 32, 3), dtype=np.uint8), (w, h), interpolation=cv2.INTER_LINEAR)
+        else:
+            img = cv2.resize(bases[i % prototypes], (w, h), interpolation=cv2.INTER_LINEAR)
+            noise = rng.normal(0, 12, size=img.shape)
+            img = np.clip(img.astype(np.float32) + noise, 0, 255).astype(np.uint8)
+        # 선명도(Laplacian 분산) 확보용 선, 흐린 이미지는 이후 강하게 블러
+        for _ in range(8):
+            p1 = (int(rng.integers(w)), int(rng.integers(h)))
+            p2 = (int(rng.integers(w)), int(rng.integers(h)))
+            cv2.line(img, p1, p2, tuple(int(c) for c in rng.integers(0, 256, 3)), 2)
+        if rng.random() < blur_ratio:
+            img = cv2.GaussianBlur(img, (0, 0), 8)
+        ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        corpus.append(buf.tobytes())
+    return corpus
+
+
+def results_page(query: str, image_base: str, count: int) -> str:
+    """네이버 이미지 탭과 같은 셀렉터로 잡히는 결과 페이지 (스크롤할 만큼 세로로 길게)."""
+    tiles = "\n".join(
+        f'<div class="image_tile_item" style="height:240px"><a class="thumb _thumb">'
+        f'<img class="_image _listImage" src="data:image/gif;base64,R0lGODlhAQABAAAAACw=" '
+        f'data-lazy-src="{image_base}/img/{i}.jpg?q={urllib.parse.quote(query)}" alt="{html.escape(query)}"></a></div>'
+        for i in range(count)
+    )
+    return (
+        "<!DOCTYPE html><html lang=\"ko\"><head><meta charset=\"UTF-8\"><title>"
+        f"{html.escape(query)} : 네이버 이미지검색</title></head><body>"
+        f'<div id="_sau_imageTab"><div class="photowall _photoGridWrapper">{tiles}</div></div></body></html>'
+    )
+
+
+class NaverStandIn:
+    """스레드로 띄우는 로컬 서버. with 문 또는 start()/stop()."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, images: int = 200, latency_ms: float = 50.0,
+                 jitter_ms: float = 20.0, page_latency_ms: float = 200.0, error_rate: float = 0.03,
+                 sizes=DEFAULT_SIZES, seed: int = 0):
+        self.corpus = make_corpus(images, sizes=sizes, seed=seed)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.page_latency_ms = page_latency_ms
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _delay(self, mean_ms: float) -> None:
+        with self._rng_lock:
+            ms = max(0.0, self._rng.gauss(mean_ms, self.jitter_ms))
+        time.sleep(ms / 1000.0)
+
+    def _broken(self) -> bool:
+        with self._rng_lock:
+            return self._rng.random() < self.error_rate
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, code: int, body: bytes, content_type: str) -> None:
+                self.send_response(code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urllib.parse.urlsplit(self.path)
+                if url.path == "/search.naver":
+                    query = urllib.parse.parse_qs(url.query).get("query", [""])[0]
+                    standin._delay(standin.page_latency_ms)
+                    page = results_page(query, standin.base_url, len(standin.corpus))
+                    self._send(200, page.encode("utf-8"), "text/html; charset=utf-8")
+                    return
+                if url.path.startswith("/img/") and url.path.endswith(".jpg"):
+                    try:
+                        idx = int(url.path[len("/img/"):-len(".jpg")])
+                        data = standin.corpus[idx]
+                    except (ValueError, IndexError):
+                        self._send(404, b"not found", "text/plain")
+                        return
+                    standin._delay(standin.latency_ms)
+                    if standin._broken():
+                        # 깨진 응답 (잘린 JPEG) → download_image 의 디코드 실패 경로
+                        data = data[: len(data) // 3]
+                    self._send(200, data, "image/jpeg")
+                    return
+                self._send(404, b"not found", "text/plain")
+
+        return Handler
+
+    def start(self) -> "NaverStandIn":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="네이버 이미지 검색 오프라인 스탠드인 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--images", type=int, default=200)
+    parser.add_argument("--latency_ms", type=float, default=50.0, help="이미지 응답 평균 지연")
+    parser.add_argument("--jitter_ms", type=float, default=20.0)
+    parser.add_argument("--page_latency_ms", type=float, default=200.0, help="결과 페이지 응답 지연")
+    parser.add_argument("--error_rate", type=float, default=0.03, help="깨진 이미지 응답 비율")
+    args = parser.parse_args()
+    standin = NaverStandIn(args.host, args.port, images=args.images, latency_ms=args.latency_ms,
+                           jitter_ms=args.jitter_ms, page_latency_ms=args.page_latency_ms, error_rate=args.error_rate)
+    print(f"[스탠드인] {standin.base_url} (이미지 {len(standin.corpus)}장) — Ctrl+C 로 종료")
+    print(f"  NAVER_SEARCH_BASE={standin.base_url} 로 수집기를 실행하면 이 서버에서 수집합니다.")
+    try:
+        standin.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
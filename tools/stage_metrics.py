@@ -0,0 +1,93 @@
+"""
+수집 작업 단계별 측정값 (시간·카운터·지연 히스토그램) → 작업 폴더의 metrics.json
+대시보드가 작업 종료 후 이 파일을 읽어 DB(job_metrics)에 저장. 표준 라이브러리만 사용.
+"""
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+METRICS_FILE = "metrics.json"
+METRICS_VERSION = 1
+
+# 히스토그램 버킷 상한 (ms). 마지막 칸은 그 이상 전부
+DEFAULT_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class Histogram:
+    def __init__(self, buckets_ms=DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.samples: list[float] = []
+
+    def observe(self, ms: float) -> None:
+        self.samples.append(ms)
+        for i, upper in enumerate(self.buckets_ms):
+            if ms <= upper:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def _percentile(self, ordered: list[float], q: float) -> float:
+        idx = min(len(ordered) - 1, max(0, round(q / 100.0 * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def to_dict(self) -> dict:
+        ordered = sorted(self.samples)
+        out = {"buckets_ms": list(self.buckets_ms), "counts": self.counts, "count": len(ordered),
+               "sum_ms": round(sum(ordered), 3)}
+        if ordered:
+            out.update({
+                "p50_ms": round(self._percentile(ordered, 50), 3),
+                "p90_ms": round(self._percentile(ordered, 90), 3),
+                "p99_ms": round(self._percentile(ordered, 99), 3),
+                "max_ms": round(ordered[-1], 3),
+            })
+        return out
+
+
+class JobMetrics:
+    """stage(): 단계 누적 시간, count(): 카운터, observe(): 호출별 지연 히스토그램."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+        self.histograms: dict[str, Histogram] = {}
+        self.extra: dict = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - start)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name: str, seconds: float) -> None:
+        if name not in self.histograms:
+            self.histograms[name] = Histogram()
+        self.histograms[name].observe(seconds * 1000.0)
+
+    def to_dict(self) -> dict:
+        return {
+            "version": METRICS_VERSION,
+            "total_s": round(time.perf_counter() - self.started, 4),
+            "stages": {k: round(v, 4) for k, v in self.stages.items()},
+            "counters": dict(self.counters),
+            "histograms": {k: h.to_dict() for k, h in self.histograms.items()},
+            **self.extra,
+        }
+
+    def write(self, out_dir) -> Path:
+        path = Path(out_dir) / METRICS_FILE
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+        return path
+
+    def summary_line(self) -> str:
+        parts = [f"{k} {v:.2f}s" for k, v in self.stages.items()]
+        return f"총 {time.perf_counter() - self.started:.2f}s — " + ", ".join(parts)